@@ -3,7 +3,8 @@ from app.db.mongodb import get_database
 import random
 
 # ✅ CORRECT IMPORT: Getting auth from the same folder
-from app.api.auth import get_current_user 
+from app.api.auth import get_current_user, user_cache
+from app.utils.identity import identity_resolver
 
 router = APIRouter()
 
@@ -40,6 +41,8 @@ async def verify_otp_and_create_abha(aadhaar: str, otp: str, current_user: dict
         {"_id": current_user["_id"]},
         {"$set": {"abha_id": abha_address, "aadhaar_linked": True}}
     )
+    user_cache.invalidate(current_user["email"])
+    identity_resolver.forget(current_user)
 
     return {
         "success": True,
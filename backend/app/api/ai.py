@@ -1,41 +1,57 @@
-import os
-import requests
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List
 from app.core.config import settings
+from app.utils.ai_client import ai_client, AIUnavailable
+from app.utils.triage_engine import local_engine
 
 router = APIRouter()
 
-# --- CONFIG ---
-HF_API_TOKEN = os.getenv("HF_TOKEN")
-AI_URL = "https://router.huggingface.co/models/facebook/bart-large-mnli"
-
 class DiagnosisRequest(BaseModel):
     diagnosis_text: str
 
+class DiagnosisBatchRequest(BaseModel):
+    diagnosis_texts: List[str] = Field(..., max_length=settings.AI_BATCH_REQUEST_MAX)
+
+# --- Pluggable backend ---
+def get_triage_backend():
+    # "remote": hosted zero-shot model (needs HF_TOKEN); anything else: local engine
+    return ai_client if settings.AI_BACKEND == "remote" else local_engine
+
+def backend_error(message: str) -> dict:
+    return {"recommended_department": message, "confidence": 0}
+
 @router.post("/predict-department")
 async def predict_department(request: DiagnosisRequest):
     """
     Analyzes diagnosis text and suggests a hospital department.
     """
-    if not HF_API_TOKEN:
-        return {"recommended_department": "Error: HF_TOKEN missing in .env", "confidence": 0}
+    backend = get_triage_backend()
+    if backend is ai_client and not settings.HF_TOKEN:
+        return backend_error("Error: HF_TOKEN missing in .env")
+
+    try:
+        return await backend.classify(request.diagnosis_text)
+    except AIUnavailable as e:
+        return backend_error(str(e))
+    except Exception as e:
+        print(f"❌ CRITICAL AI ERROR: {e}")
+        return backend_error(f"Backend Error: {str(e)}")
 
-    headers = {"Authorization": f"Bearer {HF_API_TOKEN}"}
-    candidate_labels = ["Cardiology", "Neurology", "Orthopedics", "General Medicine", "Pediatrics", "Dermatology", "Psychiatry"]
-    payload = {"inputs": request.diagnosis_text, "parameters": {"candidate_labels": candidate_labels}}
+@router.post("/predict-department/batch")
+async def predict_department_batch(request: DiagnosisBatchRequest):
+    """
+    Suggests a department for many diagnoses at once (results in request order).
+    The local engine scores the whole batch in one matrix operation.
+    """
+    backend = get_triage_backend()
+    if backend is ai_client and not settings.HF_TOKEN:
+        return {"results": [backend_error("Error: HF_TOKEN missing in .env")] * len(request.diagnosis_texts)}
 
     try:
-        response = requests.post(AI_URL, headers=headers, json=payload)
-        data = response.json()
-        
-        if "error" in data:
-            return {"recommended_department": f"HF Error: {data['error']}", "confidence": 0}
-
-        return {
-            "recommended_department": data['labels'][0],
-            "confidence": round(data['scores'][0] * 100, 1)
-        }
+        return {"results": await backend.classify_many(request.diagnosis_texts)}
+    except AIUnavailable as e:
+        return {"results": [backend_error(str(e))] * len(request.diagnosis_texts)}
     except Exception as e:
         print(f"❌ CRITICAL AI ERROR: {e}")
-        return {"recommended_department": f"Backend Error: {str(e)}", "confidence": 0}
\ No newline at end of file
+        return {"results": [backend_error(f"Backend Error: {str(e)}")] * len(request.diagnosis_texts)}
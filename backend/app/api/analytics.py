@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel, Field
+from typing import List
+
+from app.api.auth import get_government_user
+from app.core.config import settings
+from app.utils.qkd_analytics import qkd_analytics, QKDAnalyticsBusy
+from app.utils.qkd_executor import QKDExecutorBusy
+
+router = APIRouter()
+
+class LinkStudyRequest(BaseModel):
+    qubits: List[int] = Field(default=[1024, 4096, 16384], min_length=1)
+    noise: List[float] = Field(default=[0.0, 0.02, 0.05], min_length=1)
+    eavesdrop: List[float] = Field(default=[0.0], min_length=1)
+    trials: int = Field(default=1000, ge=1, le=settings.QKD_ANALYTICS_MAX_TRIALS)
+
+# ---------------------------------------------------------
+# 📈 QKD LINK ANALYTICS (Robustness of the simulated link)
+# ---------------------------------------------------------
+
+@router.post("/analytics")
+async def run_link_study(request: LinkStudyRequest, current_user: dict = Depends(get_government_user)):
+    """
+    Monte Carlo study of the BB84 link: for every (qubits, noise, eavesdrop)
+    combination, runs `trials` full protocol runs and returns percentiles
+    of the sifted-key rate, sampled QBER and secret-key rate, plus the
+    abort rate. Repeated parameter sets are served from cache. Government
+    officials only; runs on its own low-priority pool.
+    """
+    points = len(set(request.qubits)) * len(set(request.noise)) * len(set(request.eavesdrop))
+    if points > settings.QKD_ANALYTICS_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.QKD_ANALYTICS_MAX_POINTS} parameter combinations")
+    if not all(64 <= q <= settings.QKD_ANALYTICS_MAX_QUBITS for q in request.qubits):
+        raise HTTPException(status_code=400, detail=f"qubits must be between 64 and {settings.QKD_ANALYTICS_MAX_QUBITS}")
+    if not all(0.0 <= p <= 1.0 for p in request.noise + request.eavesdrop):
+        raise HTTPException(status_code=400, detail="noise and eavesdrop are probabilities (0 to 1)")
+    key = qkd_analytics.params_key(request.qubits, request.noise, request.eavesdrop, request.trials)
+    if qkd_analytics.cost(key) > settings.QKD_ANALYTICS_MAX_QUBIT_TRIALS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Study too large: trials x qubits over all combinations must stay under {settings.QKD_ANALYTICS_MAX_QUBIT_TRIALS}",
+        )
+
+    try:
+        return await qkd_analytics.study(request.qubits, request.noise, request.eavesdrop, request.trials)
+    except (QKDExecutorBusy, QKDAnalyticsBusy):
+        raise HTTPException(status_code=503, detail="Quantum key service busy. Please retry shortly.")
@@ -8,9 +8,12 @@ import re
 
 # Import your local tools
 from app.db.mongodb import get_database
+from app.core.config import settings
+from app.db.hospitals import hospital_registry
+from app.utils.cache import TTLCache
 from app.core.security import (
-    get_password_hash, 
-    verify_password, 
+    password_hasher,
+    PasswordHasherBusy,
     create_access_token, 
     SECRET_KEY, 
     ALGORITHM
@@ -19,6 +22,18 @@ from app.core.security import (
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Resolved users keyed by token subject (email). Anything that changes a
+# user document must call user_cache.invalidate(email).
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+def hashing_busy_exception():
+    # Fail fast during a login storm instead of queuing without bound
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests. Please retry in a moment.",
+        headers={"Retry-After": "1"},
+    )
+
 # --- 1. UNIFIED DATA MODEL ---
 # We use one flexible model to handle inputs from the single Registration Form
 class UserRegister(BaseModel):
@@ -30,6 +45,7 @@ class UserRegister(BaseModel):
     # ✅ CRITICAL FIX: Must be Optional to accept 'null' from Frontend
     hospital: Optional[str] = None  
     abha_number: Optional[str] = None
+    specialization: Optional[str] = None  # Doctors only (directory filter)
 
     @field_validator('hospital')
     def validate_hospital(cls, v, info):
@@ -87,7 +103,10 @@ async def register(user: UserRegister):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # C. Hash Password
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except PasswordHasherBusy:
+        raise hashing_busy_exception()
     
     # D. Prepare User Object
     new_user = {
@@ -102,9 +121,12 @@ async def register(user: UserRegister):
     # Add ABHA only if patient
     if user.role == "patient":
         new_user["abha_number"] = clean_abha
+    if user.role == "doctor" and user.specialization:
+        new_user["specialization"] = user.specialization
 
     # E. Save to DB
     result = await db["users"].insert_one(new_user)
+    await hospital_registry.add_user(db, user.hospital, user.role)
     
     return {
         "id": str(result.inserted_id),
@@ -130,8 +152,13 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         query = {"email": login_input}
         
     user = await db["users"].find_one(query)
-    
-    if not user or not verify_password(form_data.password, user["password"]):
+
+    try:
+        password_ok = bool(user) and await password_hasher.verify(form_data.password, user["password"])
+    except PasswordHasherBusy:
+        raise hashing_busy_exception()
+
+    if not password_ok:
         raise HTTPException(
             status_code=401,
             detail="Incorrect email/ABHA or password",
@@ -146,7 +173,9 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         "sub": user["email"], 
         "role": user["role"],
         "hospital": user.get("hospital"),
-        "abha": user.get("abha_number") # Embed ABHA if it exists
+        "abha": user.get("abha_number"), # Embed ABHA if it exists
+        "uid": str(user["_id"]),         # Lets read-only endpoints skip the user lookup
+        "name": user["full_name"]
     }
     
     access_token = create_access_token(
@@ -163,26 +192,65 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     }
 
 # --- 4. CURRENT USER UTILITY ---
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
 
-    db = await get_database()
-    user = await db["users"].find_one({"email": email})
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    email = _decode_token(token)["sub"]
 
+    user = user_cache.get(email)
     if user is None:
-        raise credentials_exception
+        db = await get_database()
+        user = await db["users"].find_one({"email": email})
+
+        if user is None:
+            raise _credentials_exception()
+
+        # Cache the user dict (convert ObjectId to str if needed)
+        user["_id"] = str(user["_id"])
+        user_cache.set(email, user)
+
+    # Hand out a copy so handlers can't alter the cached entry
+    return dict(user)
 
-    # Return the user dict (convert ObjectId to str if needed)
-    user["_id"] = str(user["_id"])
-    return user
\ No newline at end of file
+async def get_government_user(token: str = Depends(oauth2_scheme)):
+    """For oversight and operations endpoints: government officials only."""
+    user = await get_current_user_claims(token)
+    if user.get("role") != "government":
+        raise HTTPException(status_code=403, detail="Only government officials can access this")
+    return user
+
+async def get_current_user_claims(token: str = Depends(oauth2_scheme)):
+    """
+    For read-only endpoints. With AUTH_CLAIMS_ONLY on, builds the user from the
+    claims embedded by login (no DB or cache lookup). Otherwise, or for tokens
+    issued before those claims existed, behaves like get_current_user.
+    """
+    if not settings.AUTH_CLAIMS_ONLY:
+        return await get_current_user(token)
+
+    payload = _decode_token(token)
+    if "uid" not in payload:
+        return await get_current_user(token)
+
+    return {
+        "_id": payload["uid"],
+        "email": payload["sub"],
+        "full_name": payload.get("name"),
+        "role": payload.get("role"),
+        "hospital": payload.get("hospital"),
+        "abha": payload.get("abha"),
+    }
\ No newline at end of file
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from typing import List, Optional
 from pydantic import BaseModel
+import base64
+import hashlib
+import json
 import logging
-from app.api.auth import get_current_user # <--- ADD THIS
+import re
+from app.core.config import settings
+from app.api.auth import get_current_user_claims # <--- ADD THIS
 
 # ✅ Import get_database to use as a dependency
 from app.db.mongodb import get_database
+from app.db.hospitals import hospital_registry
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 router = APIRouter()
@@ -21,38 +27,91 @@ class DoctorResponse(BaseModel):
     hospital: str
     status: str = "Available"
 
+# Only fields held in the role_hospital_name / role_hospital_specialization_name
+# indexes, so the listing is answered from an index alone (never the user documents).
+# A covered read returns null for a field the document lacks (doctors registered
+# before specializations existed)
+DIRECTORY_PROJECTION = {"_id": 0, "full_name": 1, "email": 1, "specialization": 1, "hospital": 1}
+
+def encode_cursor(doc: dict) -> str:
+    raw = json.dumps({"n": doc.get("full_name"), "e": doc.get("email")})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> dict:
+    """Turns an opaque cursor into the filter for 'doctors after this one' (by name, email)."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        name, email = raw["n"], raw["e"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"full_name": {"$gt": name}},
+        {"full_name": name, "email": {"$gt": email}},
+    ]}
+
 # ✅ ROUTE DEFINITION
 @router.get("/", response_model=List[DoctorResponse])
 async def get_doctors_by_hospital(
+    request: Request,
     hospital: str = Query(..., description="Hospital Name"),
+    specialization: Optional[str] = Query(None, description="Exact specialization"),
+    q: Optional[str] = Query(None, description="Doctor name prefix"),
+    limit: int = Query(settings.DOCTORS_PAGE_SIZE, ge=1, le=settings.DOCTORS_PAGE_SIZE_MAX, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     # 👇 This "Depends" handles the async connection automatically for you
     db: AsyncIOMotorDatabase = Depends(get_database) 
 ):
+    """
+    Doctors of one hospital, ordered by name. Pages continue via the
+    X-Next-Cursor header. Send the ETag back as If-None-Match to get a
+    304 when the page has not changed.
+    """
     try:
         print(f"🔍 Searching for doctors in: {hospital}") 
 
         # 1. Query MongoDB 'users' collection
-        # We filter by role="doctor" AND the hospital name
-        doctors_cursor = db.users.find(
-            {"role": "doctor", "hospital": hospital},
-            {"_id": 0, "full_name": 1, "email": 1, "specialization": 1, "hospital": 1}
-        )
-        
-        doctors_list = await doctors_cursor.to_list(length=100)
-
-        # 2. Format data for the Frontend
-        formatted_doctors = []
-        for doc in doctors_list:
-            formatted_doctors.append(DoctorResponse(
-                id=doc.get("email", "no-email"), 
-                name=doc.get("full_name", "Unknown Doctor"),
-                spec=doc.get("specialization", "General Doctor"),
-                hospital=doc.get("hospital", hospital),
-                status="Available"
-            ))
-
-        return formatted_doctors
+        # We filter by role="doctor" AND the hospital name (+ optional filters)
+        query = {"role": "doctor", "hospital": hospital}
+        if specialization:
+            query["specialization"] = specialization
+        if q:
+            query["full_name"] = {"$regex": f"^{re.escape(q)}"}
+        if cursor:
+            query = {"$and": [query, decode_cursor(cursor)]}
+
+        doctors_list = await db.users.find(query, DIRECTORY_PROJECTION) \
+            .sort([("full_name", 1), ("email", 1)]) \
+            .limit(limit + 1) \
+            .to_list(length=limit + 1)
+
+        headers = {}
+        if len(doctors_list) > limit:
+            doctors_list = doctors_list[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(doctors_list[-1])
+
+        # 2. Format data for the Frontend (validated here: the raw Response
+        # below bypasses FastAPI's response_model check)
+        formatted_doctors = [
+            DoctorResponse(
+                id=doc.get("email") or "no-email",
+                name=doc.get("full_name") or "Unknown Doctor",
+                spec=doc.get("specialization") or "General Doctor",
+                hospital=doc.get("hospital") or hospital,
+            ).model_dump()
+            for doc in doctors_list
+        ]
 
+        # 3. ETag over the page content; clients revalidate instead of re-downloading
+        body = json.dumps(formatted_doctors, separators=(",", ":"))
+        etag = '"' + hashlib.sha1((body + headers.get("X-Next-Cursor", "")).encode()).hexdigest() + '"'
+        headers.update({"ETag": etag, "Cache-Control": "private, no-cache"})
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error fetching doctors: {str(e)}")
         print(f"❌ CRITICAL ERROR: {str(e)}") 
@@ -62,7 +121,7 @@ async def get_doctors_by_hospital(
 # ======================================================
 @router.get("/target-hospitals")
 async def get_target_hospitals(
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_claims),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """
@@ -72,15 +131,21 @@ async def get_target_hospitals(
     # 1. Identify "My" Hospital (e.g., "Hospital A")
     my_hospital = current_user.get("hospital")
 
-    # 2. Find all unique hospital names in the database
-    # This scans the 'users' collection to see which hospitals exist
-    all_hospitals = await db.users.distinct("hospital")
-
-    # 3. Filter the list: Keep everything that is NOT my_hospital
-    valid_targets = [
-        h for h in all_hospitals 
-        if h and h != my_hospital and h != "Unknown"
-    ]
+    # 2. Every registered hospital except my_hospital
+    # Served from the cached hospitals registry (no users scan)
+    valid_targets = await hospital_registry.targets(db, my_hospital)
 
     print(f"🏥 User is at {my_hospital}. Available Targets: {valid_targets}")
-    return valid_targets
\ No newline at end of file
+    return valid_targets
+
+# ======================================================
+# HOSPITAL DIRECTORY (Registry with doctor counts)
+# ======================================================
+@router.get("/hospitals")
+async def get_hospital_directory(db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Every registered hospital with its number of doctors."""
+    hospitals = await hospital_registry.all(db)
+    return [
+        {"hospital": name, "doctor_count": info["doctor_count"]}
+        for name, info in sorted(hospitals.items())
+    ]
@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.api.auth import user_cache, get_government_user
+from app.core.security import password_hasher
+from app.db.mongodb import get_database
+from app.db.indexes import index_report
+from app.db.hospitals import hospital_registry
+from app.utils.key_pool import key_pool
+from app.utils.qkd_executor import qkd_executor
+from app.utils.qkd_analytics import qkd_analytics
+from app.utils.identity import identity_resolver
+from app.utils.decrypt_pool import decryption_pool
+from app.utils.audit_writer import audit_writer
+from app.utils.inbox_events import inbox_broker
+from app.utils.ai_client import ai_client
+
+router = APIRouter()
+
+# ---------------------------------------------------------
+# 📊 RUNTIME METRICS (For sizing pools and caches)
+# Government only, like the other oversight endpoints
+# ---------------------------------------------------------
+
+@router.get("/key-pool")
+async def get_key_pool_metrics(_: dict = Depends(get_government_user)):
+    """Fill level, hit/miss counts and refill rate of the QKD key pool."""
+    return key_pool.stats()
+
+@router.get("/qkd-executor")
+async def get_qkd_executor_metrics(_: dict = Depends(get_government_user)):
+    """Worker count, pending jobs and rejections of the QKD process pool."""
+    return qkd_executor.stats()
+
+@router.get("/qkd-analytics")
+async def get_qkd_analytics_metrics(_: dict = Depends(get_government_user)):
+    """Studies run, qubit-trial budget, result-cache hit ratio and pool of link analytics."""
+    return qkd_analytics.stats()
+
+@router.get("/password-hashing")
+async def get_password_hashing_metrics(_: dict = Depends(get_government_user)):
+    """Queue depth, rejections and latency of bcrypt hashing/verification."""
+    return password_hasher.stats()
+
+@router.get("/user-cache")
+async def get_user_cache_metrics(_: dict = Depends(get_government_user)):
+    """Size, hit ratio and evictions of the get_current_user cache."""
+    return user_cache.stats()
+
+@router.get("/identity-cache")
+async def get_identity_cache_metrics(_: dict = Depends(get_government_user)):
+    """Size and hit ratio of the patient identity cache used by record writes."""
+    return identity_resolver.stats()
+
+@router.get("/decryption")
+async def get_decryption_metrics(_: dict = Depends(get_government_user)):
+    """Inline vs parallel batches and per-request decrypt time for record reads."""
+    return decryption_pool.stats()
+
+@router.get("/hospital-registry")
+async def get_hospital_registry_metrics(_: dict = Depends(get_government_user)):
+    """Hit ratio and invalidations of the cached hospitals registry."""
+    return hospital_registry.stats()
+
+@router.get("/audit-writer")
+async def get_audit_writer_metrics(_: dict = Depends(get_government_user)):
+    """Queue depth, batch sizes and flush latency of the buffered audit writer."""
+    return audit_writer.stats()
+
+@router.get("/inbox-stream")
+async def get_inbox_stream_metrics(_: dict = Depends(get_government_user)):
+    """Open inbox streams and events published, delivered and dropped."""
+    return inbox_broker.stats()
+
+@router.get("/ai-client")
+async def get_ai_client_metrics(_: dict = Depends(get_government_user)):
+    """Circuit state, batching and cache hit ratio of the AI triage client."""
+    return ai_client.stats()
+
+@router.get("/indexes")
+async def get_index_metrics(
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    _: dict = Depends(get_government_user),
+):
+    """
+    Declared indexes that are missing, and existing indexes that are unused.
+    Government only: runs $indexStats over every collection.
+    """
+    return await index_report(db)
@@ -1,16 +1,32 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from app.db.mongodb import get_database
+from app.core.config import settings
 from app.models.record import RecordCreate, RecordResponse
-from app.api.auth import get_current_user
+from app.api.auth import get_current_user, get_current_user_claims
 from datetime import datetime
 from typing import Optional, List
+import json
 
 # ⚛️ IMPORT QUANTUM TOOLS
-from app.utils.quantum import simulate_qkd_exchange
-from app.utils.encryption import encrypt_data, decrypt_data
+from app.utils.key_pool import key_pool
+from app.utils.qkd_executor import QKDExecutorBusy
+from app.utils.encryption import seal_record_fields, key_to_binary, content_signature
+from app.utils.identity import identity_resolver
+from app.utils.decrypt_pool import decryption_pool
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
+NDJSON = "application/x-ndjson"
+
+def serialize_record(rec: dict) -> dict:
+    # Convert ObjectIds to string
+    rec["_id"] = str(rec["_id"])
+    if "doctor_id" in rec: rec["doctor_id"] = str(rec["doctor_id"])
+    return rec
+
 # --- 1. CREATE RECORD (The Gatekeeper) ---
 @router.post("/create", response_model=RecordResponse)
 async def create_record(record: RecordCreate, current_user: dict = Depends(get_current_user)):
@@ -22,37 +38,30 @@ async def create_record(record: RecordCreate, current_user: dict = Depends(get_c
     
     db = await get_database()
     
-    # B. SMART PATIENT LOOKUP (Email OR ABHA)
-    patient = None
-    
-    if record.patient_abha:
-        # Clean the input (remove dashes)
-        clean_abha = record.patient_abha.replace("-", "").replace(" ", "")
-        patient = await db["users"].find_one({"abha_number": clean_abha})
-    elif record.patient_email:
-        patient = await db["users"].find_one({"email": record.patient_email})
-    else:
+    # B. SMART PATIENT LOOKUP (Email OR ABHA, cached)
+    if not (record.patient_abha or record.patient_email):
         raise HTTPException(status_code=400, detail="Must provide either Patient Email or ABHA Number")
 
+    patient = await identity_resolver.resolve(db, abha=record.patient_abha, email=record.patient_email)
+
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found. Please check the ID.")
 
     # -------------------------------------------------------
     # ⚛️ QUANTUM ENCRYPTION STEP
     # -------------------------------------------------------
-    qkd_result = simulate_qkd_exchange()
-    secret_key = qkd_result['final_key']
-
-    # Encrypt Data
-    encrypted_diagnosis = encrypt_data(record.diagnosis, secret_key)
-    encrypted_prescription = encrypt_data(record.prescription, secret_key)
+    try:
+        secret_key = await key_pool.take()
+    except QKDExecutorBusy:
+        raise HTTPException(status_code=503, detail="Quantum key service busy. Please retry shortly.")
 
     record_dict = record.model_dump()
+    plaintext = {"diagnosis": record_dict.pop("diagnosis"), "prescription": record_dict.pop("prescription")}
     
-    # Overwrite plain text with Encrypted text
-    record_dict["diagnosis"] = encrypted_diagnosis
-    record_dict["prescription"] = encrypted_prescription
-    record_dict["quantum_key"] = secret_key
+    # Replace plain text with one encrypted blob (storage format v2)
+    record_dict["sealed_fields"] = seal_record_fields(plaintext, secret_key)
+    record_dict["storage_format"] = 2
+    record_dict["quantum_key"] = key_to_binary(secret_key)
     # -------------------------------------------------------
 
     # C. STAMP METADATA (The Silo)
@@ -63,28 +72,39 @@ async def create_record(record: RecordCreate, current_user: dict = Depends(get_c
     
     record_dict["patient_id"] = str(patient["_id"])
     record_dict["patient_abha"] = patient.get("abha_number", "N/A")
+    # Fingerprint for transfer dedup, taken while the plaintext is at hand
+    record_dict["data_signature"] = content_signature(record_dict["patient_id"], plaintext["diagnosis"])
     record_dict["created_at"] = datetime.utcnow()
     
     # D. SAVE TO DB
     new_record = await db["records"].insert_one(record_dict)
     
-    # E. DECRYPT FOR RESPONSE (So the doctor sees what they just wrote)
-    created_record = await db["records"].find_one({"_id": new_record.inserted_id})
-    created_record["diagnosis"] = decrypt_data(created_record["diagnosis"], secret_key)
-    created_record["prescription"] = decrypt_data(created_record["prescription"], secret_key)
-    
-    created_record["_id"] = str(created_record["_id"]) # Fix ObjectId for Pydantic
-    
-    return created_record
+    # E. RESPOND FROM MEMORY (So the doctor sees what they just wrote, no read-back)
+    return {
+        **record_dict,
+        **plaintext,
+        "_id": str(new_record.inserted_id), # Fix ObjectId for Pydantic
+    }
 
 
 # --- 2. FETCH RECORDS (The Traffic Cop) ---
 @router.get("/my-records")
 async def get_my_records(
-    current_user: dict = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_user_claims),
     search_abha: Optional[str] = Query(None, description="Search by ABHA"),
-    hospital_filter: Optional[str] = Query(None, description="Filter by Hospital")
+    hospital_filter: Optional[str] = Query(None, description="Filter by Hospital"),
+    limit: int = Query(settings.RECORDS_PAGE_SIZE, ge=1, le=settings.RECORDS_PAGE_SIZE_MAX, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    format: Optional[str] = Query(None, description="'ndjson' to stream the full history")
 ):
+    """
+    Newest records first, one page at a time. When more records exist, the
+    X-Next-Cursor response header holds the cursor for the next page.
+    With format=ndjson (or Accept: application/x-ndjson), streams every
+    record from the cursor onwards, one JSON object per line.
+    """
     db = await get_database()
     query = {}
     
@@ -122,26 +142,40 @@ async def get_my_records(
         query["patient_abha"] = search_abha.replace("-", "").replace(" ", "")
 
     # --- EXECUTE QUERY ---
-    records = await db["records"].find(query).sort("created_at", -1).to_list(100)
+    if cursor:
+        query = {"$and": [query, decode_cursor(cursor, "created_at")]}
+    sort = [("created_at", -1), ("_id", -1)]
+
+    # --- STREAMING MODE: decrypt and emit one Motor batch at a time ---
+    if format == "ndjson" or NDJSON in request.headers.get("accept", ""):
+        async def emit(batch):
+            await decryption_pool.decrypt(batch)
+            return "".join(json.dumps(jsonable_encoder(serialize_record(rec))) + "\n" for rec in batch)
+
+        async def stream():
+            batch = []
+            async for rec in db["records"].find(query).sort(sort).batch_size(limit):
+                batch.append(rec)
+                if len(batch) == limit:
+                    yield await emit(batch)
+                    batch = []
+            if batch:
+                yield await emit(batch)
+        return StreamingResponse(stream(), media_type=NDJSON)
+
+    # Fetch one extra record to learn whether another page exists
+    records = await db["records"].find(query).sort(sort).limit(limit + 1).to_list(limit + 1)
+    if len(records) > limit:
+        records = records[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(records[-1], "created_at")
     
     # -------------------------------------------------------
     # ⚛️ QUANTUM DECRYPTION STEP
     # -------------------------------------------------------
-    decrypted_records = []
-    for rec in records:
-        try:
-            if "quantum_key" in rec:
-                key = rec["quantum_key"]
-                rec["diagnosis"] = decrypt_data(rec["diagnosis"], key)
-                rec["prescription"] = decrypt_data(rec["prescription"], key)
-            
-            # Convert ObjectIds to string
-            rec["_id"] = str(rec["_id"])
-            if "doctor_id" in rec: rec["doctor_id"] = str(rec["doctor_id"])
-                
-            decrypted_records.append(rec)
-        except Exception as e:
-            print(f"Decryption Error: {e}")
-            decrypted_records.append(rec)
-            
-    return decrypted_records
\ No newline at end of file
+    # Decrypt the whole page; reads v1 and v2 documents alike. Large pages
+    # are split across the decryption threads, small ones stay inline.
+    # A field that fails to decrypt is left as-is (same fallback as before).
+    decrypt_ms = await decryption_pool.decrypt(records)
+    response.headers["Server-Timing"] = f"decrypt;dur={decrypt_ms:.2f}"
+
+    return [serialize_record(rec) for rec in records]
\ No newline at end of file
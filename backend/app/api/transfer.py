@@ -1,20 +1,36 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from bson import ObjectId
-from datetime import datetime
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timedelta
+from jose import jwt, JWTError
+import asyncio
+import json
 import logging
 import hashlib
 
 # Database & Auth
-from app.db.mongodb import get_database
+from app.db.mongodb import get_database, supports_transactions
+from app.db.indexes import TRANSFER_INBOX, INBOX_PREFIX
+from app.core.config import settings
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from app.api.auth import get_current_user
+from app.api.auth import get_current_user, get_current_user_claims
+from app.core.security import create_access_token, SECRET_KEY, ALGORITHM
 
 # Encryption & QKD Tools
 # Ensure these utility files exist in your app/utils folder!
-from app.utils.encryption import encrypt_data, decrypt_data 
-from app.utils.quantum import simulate_qkd_exchange 
+from app.utils.encryption import (
+    decrypt_data, decrypt_many_checked, encrypt_many, decrypt_records, content_signature,
+    DECRYPT_FAILED, DECRYPT_ERROR_DIAGNOSIS, undecryptable
+)
+from app.utils.key_pool import key_pool
+from app.utils.qkd_executor import QKDExecutorBusy
+from app.utils.audit_writer import audit_writer
+from app.utils.inbox_events import inbox_broker
+from app.models.record import AuditLog
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -27,11 +43,60 @@ class BatchTransferRequest(BaseModel):
 class AcceptRequest(BaseModel):
     inbox_id: str
 
+class AcceptBatchRequest(BaseModel):
+    inbox_ids: List[str]
+
 # Helper to safely get hospital name
 def get_hospital_name(user: dict) -> str:
     # Tries 'hospital_name' first, then 'hospital', then defaults to Unknown
     return user.get("hospital_name", user.get("hospital", "Unknown"))
 
+# Partition key of a hospital's packets in transfer_inbox
+# (same normalisation as the old inbox_<name> collections)
+def inbox_key(hospital: str) -> str:
+    return hospital.lower().strip().replace(" ", "_")
+
+# Pre-cutover inbox_<name> collection, read only while compatibility reads are on
+def legacy_inbox(db, key: str):
+    return db[f"{INBOX_PREFIX}{key}"] if settings.TRANSFER_INBOX_LEGACY_READS else None
+
+# Tells the hospital's other open inbox streams (other doctors, other tabs)
+# that these packets are gone. In-process only, also in change-stream mode,
+# which watches inserts; other workers' clients catch up on their next poll.
+def notify_accepted(partition: str, inbox_ids: list):
+    if inbox_ids:
+        inbox_broker.publish(partition, {"kind": "accepted", "ids": list(inbox_ids)})
+
+# Builds the receiving hospital's copy of an accepted packet
+def accepted_record(packet: dict, diagnosis: Optional[str], prescription, current_user: dict, my_hospital: str) -> dict:
+    """
+    diagnosis is None when the packet could not be decrypted: the record
+    then keeps the error marker for manual review, carries DECRYPT_FAILED
+    and no data_signature, so it is never deduplicated against or re-sent.
+    """
+    # ⚠️ We assign YOU (current_user) as the doctor so it shows in your dashboard
+    record = {
+        "doctor_id": str(current_user["_id"]),  
+        "doctor_name": current_user["full_name"],
+        "hospital": my_hospital,
+        
+        # Copied Data
+        "patient_email": packet.get("patient_email"),
+        "patient_abha": packet.get("patient_abha"),
+        "patient_id": packet.get("patient_id"),
+        "diagnosis": diagnosis if diagnosis is not None else DECRYPT_ERROR_DIAGNOSIS,
+        "prescription": prescription, 
+        
+        "created_at": datetime.now(),
+        "transferred_from": packet.get("sender_hospital"),
+        "is_transferred": True
+    }
+    if diagnosis is None:
+        record[DECRYPT_FAILED] = True
+    else:
+        record["data_signature"] = content_signature(packet.get("patient_id"), diagnosis)
+    return record
+
 # ==========================================
 # 1. SEND TRANSFER (Doctor A -> Doctor B)
 # ==========================================
@@ -43,81 +108,157 @@ async def execute_batch_transfer(
 ):
     summary = { "success": [], "skipped": [], "failed": [] }
     
-    # 1. Setup Target Collection
-    safe_target_name = req.target_hospital_name.lower().strip().replace(" ", "_")
-    target_collection_name = f"inbox_{safe_target_name}"
+    # 1. Setup Target Partition
+    target_key = inbox_key(req.target_hospital_name)
     
     sender_name = get_hospital_name(current_user)
 
+    # 2. Fetch Source Records (one $in query for the whole batch)
+    valid_ids = []
     for rid in req.record_ids:
+        if ObjectId.is_valid(rid):
+            valid_ids.append(rid)
+        else:
+            summary["failed"].append({"id": rid, "reason": "Invalid ID"})
+
+    try:
+        found = await db["records"].find(
+            {"_id": {"$in": [ObjectId(rid) for rid in set(valid_ids)]}}
+        ).to_list(None)
+    except Exception as e:
+        logger.error(f"Error fetching batch: {e}")
+        summary["failed"].extend({"id": rid, "reason": str(e)} for rid in valid_ids)
+        return summary
+    records_by_id = {str(rec["_id"]): rec for rec in found}
+
+    fetched = []
+    for rid in valid_ids:
+        if rid not in records_by_id:
+            summary["failed"].append({"id": rid, "reason": "Not Found"})
+        else:
+            fetched.append((rid, records_by_id[rid]))
+
+    # 3. Signatures (Prevents Duplicates): stored at write time. Only records
+    # written before that (not yet backfilled) are decrypted here to compute one.
+    decrypted = set()
+    unsigned = {rid: rec for rid, rec in records_by_id.items() if not rec.get("data_signature")}
+    if unsigned:
+        decrypt_records(list(unsigned.values()))
+        decrypted.update(unsigned)
+        for rec in unsigned.values():
+            if not undecryptable(rec):
+                rec["data_signature"] = content_signature(rec.get("patient_id"), rec["diagnosis"])
+
+    # A record that can't be decrypted (here, or when it was accepted) is never signed or sent
+    signed = []
+    for rid, record in fetched:
+        if undecryptable(record):
+            summary["failed"].append({"id": rid, "reason": "Decryption failed"})
+        else:
+            signed.append((rid, record, record["data_signature"]))
+
+    # 4. Check which were already sent (one indexed query for the whole batch)
+    already_sent = set()
+    if signed:
+        sent_query = {
+            "original_record_id": {"$in": [rid for rid, _, _ in signed]},
+            "data_signature": {"$in": [sig for _, _, sig in signed]},
+        }
+        projection = {"_id": 0, "original_record_id": 1, "data_signature": 1}
+        collections = [(db[TRANSFER_INBOX], {"target_hospital": target_key, **sent_query})]
+        legacy = legacy_inbox(db, target_key)
+        if legacy is not None:
+            collections.append((legacy, sent_query))
+        for collection, query in collections:
+            async for doc in collection.find(query, projection):
+                already_sent.add((doc["original_record_id"], doc["data_signature"]))
+
+    to_send = []
+    for rid, record, data_signature in signed:
+        if (rid, data_signature) in already_sent:
+            summary["skipped"].append(rid)
+            continue
+        already_sent.add((rid, data_signature))  # same id twice in one request
+        to_send.append((rid, record, data_signature))
+
+    # 5. Decrypt only what is actually going out (v1 or v2), in one call
+    pending = {rid: record for rid, record, _ in to_send if rid not in decrypted}
+    if pending:
+        decrypt_records(list(pending.values()))
+        for rid, record, _ in to_send:
+            if record.get(DECRYPT_FAILED):
+                summary["failed"].append({"id": rid, "reason": "Decryption failed"})
+        to_send = [item for item in to_send if not item[1].get(DECRYPT_FAILED)]
+
+    # 6. QKD ENCRYPTION
+    # Keys come from the pre-generated pool; any shortfall is one vectorized QKD run
+    try:
+        transmission_keys = await key_pool.take_many(len(to_send))
+    except QKDExecutorBusy:
+        raise HTTPException(status_code=503, detail="Quantum key service busy. Please retry shortly.")
+    secure_fields = encrypt_many([
+        (text, key)
+        for (_, record, _), key in zip(to_send, transmission_keys)
+        for text in (record["diagnosis"], record.get("prescription") or "")
+    ])
+
+    # 7. Send to Target Inbox (one unordered bulk insert)
+    transfer_packets = []
+    for i, ((rid, record, data_signature), transmission_key) in enumerate(zip(to_send, transmission_keys)):
+        transfer_packets.append({
+            "original_record_id": rid,
+            "sender_hospital": sender_name,
+            "received_from": sender_name,
+            "target_hospital": target_key,                    # Partition key
+            "patient_id": record.get("patient_id"),
+            "patient_email": record.get("patient_email"),
+            "patient_abha": record.get("patient_abha"),
+            "encrypted_diagnosis": secure_fields[2 * i],      # Encrypted!
+            "prescription": secure_fields[2 * i + 1],         # Encrypted with the same key
+            "decryption_key": transmission_key,               # Key for receiver
+            "data_signature": data_signature,
+            "received_at": datetime.now(),
+            "status": "LOCKED"
+        })
+
+    failed_at = {}
+    if transfer_packets:
         try:
-            if not ObjectId.is_valid(rid):
-                summary["failed"].append({"id": rid, "reason": "Invalid ID"})
-                continue
-
-            # 2. Fetch Source Record
-            record = await db["records"].find_one({"_id": ObjectId(rid)})
-            if not record:
-                summary["failed"].append({"id": rid, "reason": "Not Found"})
-                continue
-
-            # 3. Decrypt Source (if it was encrypted) to prepare for QKD
-            storage_key = record.get("quantum_key")
-            plain_diagnosis = record["diagnosis"]
-            if storage_key:
-                try:
-                    plain_diagnosis = decrypt_data(record["diagnosis"], storage_key)
-                except Exception:
-                    pass # Fallback to existing value if decryption fails
-
-            # 4. Generate Signature (Prevents Duplicates)
-            raw_data_string = f"{record.get('patient_id')}-{plain_diagnosis}"
-            data_signature = hashlib.sha256(raw_data_string.encode()).hexdigest()
-
-            # 5. Check if already sent
-            existing = await db[target_collection_name].find_one({
-                "original_record_id": rid, "data_signature": data_signature
-            })
-            if existing:
-                summary["skipped"].append(rid)
-                continue 
-
-            # 6. QKD ENCRYPTION
-            qkd_session = simulate_qkd_exchange()
-            transmission_key = qkd_session["final_key"]
-            secure_diagnosis = encrypt_data(plain_diagnosis, transmission_key)
-
-            # 7. Send to Target Inbox
-            transfer_packet = {
-                "original_record_id": rid,
-                "sender_hospital": sender_name,
-                "received_from": sender_name,
-                "target_hospital": req.target_hospital_name, 
-                "patient_id": record.get("patient_id"),
-                "patient_email": record.get("patient_email"),
-                "patient_abha": record.get("patient_abha"),
-                "encrypted_diagnosis": secure_diagnosis, # Encrypted!
-                "prescription": record.get("prescription"),
-                "decryption_key": transmission_key,      # Key for receiver
-                "data_signature": data_signature,
-                "received_at": datetime.now(),
-                "status": "LOCKED"
-            }
-            await db[target_collection_name].insert_one(transfer_packet)
-
-            # 8. Audit Log
-            await db["audit_logs"].insert_one({
-                "sender_hospital": sender_name,
-                "receiver_hospital": req.target_hospital_name,
-                "record_id": rid,
-                "status": "SECURE TRANSFER",
-                "timestamp": datetime.now()
-            })
+            await db[TRANSFER_INBOX].insert_many(transfer_packets, ordered=False)
+        except BulkWriteError as e:
+            failed_at = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+        except Exception as e:
+            failed_at = dict.fromkeys(range(len(transfer_packets)), str(e))
+
+    delivered = []
+    for i, (rid, _, _) in enumerate(to_send):
+        if i in failed_at:
+            logger.error(f"Error processing {rid}: {failed_at[i]}")
+            summary["failed"].append({"id": rid, "reason": failed_at[i]})
+        else:
+            delivered.append(rid)
             summary["success"].append(rid)
 
-        except Exception as e:
-            logger.error(f"Error processing {rid}: {e}")
-            summary["failed"].append({"id": rid, "reason": str(e)})
+    # Notify the receiving hospital's open inbox streams
+    if delivered and not inbox_broker.uses_change_stream:
+        inbox_broker.publish(target_key, {"count": len(delivered), "sender": sender_name})
+
+    # 8. Audit Log (queued; the buffered writer flushes it off the request path)
+    if delivered:
+        keys_by_id = {rid: key for (rid, _, _), key in zip(to_send, transmission_keys)}
+        await audit_writer.write([
+            AuditLog(
+                sender_hospital=sender_name,
+                sender_doctor=current_user.get("full_name", "Unknown"),
+                receiver_hospital=req.target_hospital_name,
+                record_id=rid,
+                # Fingerprint only; the key itself never goes into the log
+                qkd_key_id=hashlib.sha256(keys_by_id[rid].encode()).hexdigest()[:16],
+                status="SECURE TRANSFER",
+                timestamp=datetime.now()
+            )
+            for rid in delivered
+        ])
 
     return summary
 
@@ -126,16 +267,22 @@ async def execute_batch_transfer(
 # ==========================================
 @router.get("/my-inbox")
 async def get_my_hospital_inbox(
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_claims),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     my_hospital = get_hospital_name(current_user)
     if my_hospital == "Unknown": return []
 
-    safe_name = my_hospital.lower().strip().replace(" ", "_")
-    collection_name = f"inbox_{safe_name}"
+    key = inbox_key(my_hospital)
+    inbox_records = await db[TRANSFER_INBOX].find(
+        {"target_hospital": key, "status": "LOCKED"}
+    ).sort("received_at", -1).limit(50).to_list(50)
 
-    inbox_records = await db[collection_name].find().sort("received_at", -1).limit(50).to_list(50)
+    # Cutover: merge in packets not yet migrated from the old collection
+    legacy = legacy_inbox(db, key)
+    if legacy is not None:
+        inbox_records += await legacy.find().sort("received_at", -1).limit(50).to_list(50)
+        inbox_records = sorted(inbox_records, key=lambda r: r["received_at"], reverse=True)[:50]
 
     formatted_records = []
     for rec in inbox_records:
@@ -149,6 +296,72 @@ async def get_my_hospital_inbox(
 
     return formatted_records
 
+# ==========================================
+# 2b. INBOX STREAM (Server-Sent Events instead of polling)
+# ==========================================
+STREAM_SCOPE = "inbox_stream"
+
+@router.post("/inbox/stream-ticket")
+async def issue_inbox_stream_ticket(current_user: dict = Depends(get_current_user_claims)):
+    """
+    EventSource can't send an Authorization header, so the stream URL carries
+    a ticket instead of the access token: valid for opening a stream on the
+    caller's inbox only, for INBOX_STREAM_TICKET_SECONDS. It has no 'sub', so
+    it is useless as an access token if it leaks into a log.
+    """
+    my_hospital = get_hospital_name(current_user)
+    if my_hospital == "Unknown":
+        raise HTTPException(status_code=400, detail="No hospital inbox for this user")
+    ticket = create_access_token(
+        {"scope": STREAM_SCOPE, "inbox": inbox_key(my_hospital)},
+        expires_delta=timedelta(seconds=settings.INBOX_STREAM_TICKET_SECONDS),
+    )
+    return {"ticket": ticket, "expires_in": settings.INBOX_STREAM_TICKET_SECONDS}
+
+def stream_ticket_inbox(ticket: str) -> str:
+    try:
+        payload = jwt.decode(ticket, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        payload = {}
+    if payload.get("scope") != STREAM_SCOPE or not payload.get("inbox"):
+        raise HTTPException(status_code=401, detail="Invalid or expired stream ticket")
+    return payload["inbox"]
+
+@router.get("/inbox/stream")
+async def stream_my_hospital_inbox(
+    request: Request,
+    ticket: str = Query(..., description="Ticket from POST /inbox/stream-ticket"),
+):
+    """
+    Pushes a 'transfer' event whenever new packets reach the caller's
+    hospital inbox and an 'accepted' event when packets leave it; the
+    client then refetches /my-inbox. Sends a comment line as keep-alive so
+    proxies don't close an idle stream. The ticket is checked only when
+    the stream opens; a reconnect needs a fresh one.
+    """
+    partition = stream_ticket_inbox(ticket)
+
+    async def events():
+        queue = inbox_broker.subscribe(partition)
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), settings.INBOX_STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                kind = event.get("kind", "transfer")
+                yield f"event: {kind}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            inbox_broker.unsubscribe(partition, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # ==========================================
 # 3. ACCEPT TRANSFER (Doctor B Decrypts & Claims)
 # ==========================================
@@ -160,14 +373,18 @@ async def accept_transfer(
 ):
     # 1. Identify Inbox
     my_hospital = get_hospital_name(current_user)
-    safe_name = my_hospital.lower().strip().replace(" ", "_")
-    inbox_collection = f"inbox_{safe_name}"
+    partition = inbox_key(my_hospital)
 
     if not ObjectId.is_valid(req.inbox_id):
         raise HTTPException(status_code=400, detail="Invalid ID")
     
-    # 2. Find Record
-    record_in_inbox = await db[inbox_collection].find_one({"_id": ObjectId(req.inbox_id)})
+    # 2. Find Record (the old per-hospital collection during the cutover)
+    inbox_collection = db[TRANSFER_INBOX]
+    record_in_inbox = await inbox_collection.find_one({"_id": ObjectId(req.inbox_id), "target_hospital": partition})
+    legacy = legacy_inbox(db, partition)
+    if not record_in_inbox and legacy is not None:
+        inbox_collection = legacy
+        record_in_inbox = await legacy.find_one({"_id": ObjectId(req.inbox_id)})
     if not record_in_inbox:
         raise HTTPException(status_code=404, detail="Record not found in Inbox")
 
@@ -180,30 +397,210 @@ async def accept_transfer(
         decrypted_diagnosis = decrypt_data(encrypted_text, key)
     except Exception as e:
         print(f"Decryption failed: {e}")
-        decrypted_diagnosis = "Decryption Error - Manual Review Needed"
+        decrypted_diagnosis = None   # stored flagged, for manual review
+
+    # Prescription travels under the same key (older packets carry it as stored)
+    prescription = record_in_inbox.get("prescription")
+    try:
+        prescription = decrypt_data(prescription, record_in_inbox.get("decryption_key"))
+    except Exception:
+        pass
 
     # 4. Create NEW record in Main History
-    # ⚠️ We assign YOU (current_user) as the doctor so it shows in your dashboard
-    new_record = {
-        "doctor_id": str(current_user["_id"]),  
-        "doctor_name": current_user["full_name"],
-        "hospital": my_hospital,
-        
-        # Copied Data
-        "patient_email": record_in_inbox.get("patient_email"),
-        "patient_abha": record_in_inbox.get("patient_abha"),
-        "patient_id": record_in_inbox.get("patient_id"),
-        "diagnosis": decrypted_diagnosis,     
-        "prescription": record_in_inbox.get("prescription"), 
-        
-        "created_at": datetime.now(),
-        "transferred_from": record_in_inbox.get("sender_hospital"),
-        "is_transferred": True
-    }
+    new_record = accepted_record(record_in_inbox, decrypted_diagnosis, prescription, current_user, my_hospital)
 
     await db["records"].insert_one(new_record)
 
-    # 5. Cleanup Inbox
-    await db[inbox_collection].delete_one({"_id": ObjectId(req.inbox_id)})
+    # 5. Cleanup Inbox (a legacy packet may already have a migrated copy, same _id)
+    await inbox_collection.delete_one({"_id": ObjectId(req.inbox_id)})
+    if inbox_collection.name != TRANSFER_INBOX:
+        await db[TRANSFER_INBOX].delete_one({"_id": ObjectId(req.inbox_id)})
+    notify_accepted(partition, [req.inbox_id])
+
+    return {"status": "success", "message": "Patient accepted into your database"}
+
+# ==========================================
+# 4. ACCEPT MANY (Doctor B Claims a Whole Batch)
+# ==========================================
+@router.post("/accept-batch")
+async def accept_batch_transfer(
+    req: AcceptBatchRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Accepts many inbox packets at once: one fetch, one batch decrypt, one
+    insert_many into records and one delete_many per inbox collection.
+    Runs in a transaction when the deployment supports it.
+    """
+    summary = { "success": [], "failed": [] }
+
+    my_hospital = get_hospital_name(current_user)
+    partition = inbox_key(my_hospital)
+
+    # 1. Validate IDs (duplicates in the request are accepted once)
+    valid_ids = []
+    for iid in dict.fromkeys(req.inbox_ids):
+        if ObjectId.is_valid(iid):
+            valid_ids.append(iid)
+        else:
+            summary["failed"].append({"id": iid, "reason": "Invalid ID"})
+
+    # 2. Fetch Packets (one query; the old per-hospital collection during the cutover)
+    packets = {}   # inbox id -> (collection, packet)
+    oids = [ObjectId(iid) for iid in valid_ids]
+    if oids:
+        async for packet in db[TRANSFER_INBOX].find({"_id": {"$in": oids}, "target_hospital": partition}):
+            packets[str(packet["_id"])] = (db[TRANSFER_INBOX], packet)
+        legacy = legacy_inbox(db, partition)
+        missing = [oid for oid in oids if str(oid) not in packets]
+        if legacy is not None and missing:
+            async for packet in legacy.find({"_id": {"$in": missing}}):
+                packets[str(packet["_id"])] = (legacy, packet)
+
+    found = []
+    for iid in valid_ids:
+        if iid in packets:
+            found.append(iid)
+        else:
+            summary["failed"].append({"id": iid, "reason": "Not Found"})
+    if not found:
+        return summary
+
+    # 3. DECRYPT (one batch, same fallbacks as /accept)
+    pairs = []
+    for iid in found:
+        packet = packets[iid][1]
+        pairs += [(packet.get(field), packet.get("decryption_key")) for field in ("encrypted_diagnosis", "prescription")]
+    plain, ok = decrypt_many_checked(pairs)
+
+    new_records = []
+    for i, iid in enumerate(found):
+        # A prescription that fails stays as stored (older packets carry it in the clear)
+        diagnosis, prescription = plain[2 * i], plain[2 * i + 1]
+        if not ok[2 * i]:
+            diagnosis = None   # stored flagged, for manual review
+        new_records.append(accepted_record(packets[iid][1], diagnosis, prescription, current_user, my_hospital))
+
+    async def cleanup(accepted, session=None):
+        by_collection = {}
+        for iid in accepted:
+            collection = packets[iid][0]
+            by_collection.setdefault(collection.name, (collection, []))[1].append(ObjectId(iid))
+        for collection, ids in by_collection.values():
+            await collection.delete_many({"_id": {"$in": ids}}, session=session)
+            # A legacy packet may already have a migrated copy (same _id)
+            if collection.name != TRANSFER_INBOX:
+                await db[TRANSFER_INBOX].delete_many({"_id": {"$in": ids}}, session=session)
+
+    # 4. Write Records + Cleanup Inbox
+    if await supports_transactions():
+        # All or nothing
+        try:
+            async with await db.client.start_session() as session:
+                async with session.start_transaction():
+                    await db["records"].insert_many(new_records, ordered=False, session=session)
+                    await cleanup(found, session=session)
+            summary["success"].extend(found)
+            notify_accepted(partition, found)
+        except Exception as e:
+            logger.error(f"Accept batch rolled back ({len(found)} packets): {e}")
+            summary["failed"].extend({"id": iid, "reason": str(e)} for iid in found)
+        return summary
+
+    # No transactions: only packets whose record was written leave the inbox
+    failed_at = {}
+    try:
+        await db["records"].insert_many(new_records, ordered=False)
+    except BulkWriteError as e:
+        failed_at = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+    except Exception as e:
+        failed_at = dict.fromkeys(range(len(found)), str(e))
+
+    accepted = []
+    for i, iid in enumerate(found):
+        if i in failed_at:
+            summary["failed"].append({"id": iid, "reason": failed_at[i]})
+        else:
+            accepted.append(iid)
+
+    if accepted:
+        try:
+            await cleanup(accepted)
+        except Exception as e:
+            # Records exist; a leftover packet can be accepted again or deleted
+            logger.error(f"Inbox cleanup failed after accepting {len(accepted)} packets: {e}")
+    summary["success"].extend(accepted)
+    notify_accepted(partition, accepted)
+
+    return summary
+
+
+# ==========================================
+# 5. AUDIT LOGS (Government Oversight)
+# ==========================================
+def require_government(user: dict):
+    if user.get("role") != "government":
+        raise HTTPException(status_code=403, detail="Only government officials can view audit logs")
+
+@router.get("/audit-logs")
+async def get_audit_logs(
+    response: Response,
+    start: Optional[datetime] = Query(None, description="From (inclusive)"),
+    end: Optional[datetime] = Query(None, description="Until (exclusive)"),
+    sender_hospital: Optional[str] = Query(None),
+    receiver_hospital: Optional[str] = Query(None),
+    record_id: Optional[str] = Query(None),
+    limit: int = Query(settings.AUDIT_PAGE_SIZE, ge=1, le=settings.AUDIT_PAGE_SIZE_MAX, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    current_user: dict = Depends(get_current_user_claims),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Transfer audit trail, newest first. Metadata only, never medical data.
+    When more entries exist, X-Next-Cursor holds the cursor for the next page.
+    """
+    require_government(current_user)
+
+    query = {}
+    if start or end:
+        query["timestamp"] = {}
+        if start: query["timestamp"]["$gte"] = start
+        if end: query["timestamp"]["$lt"] = end
+    if sender_hospital: query["sender_hospital"] = sender_hospital
+    if receiver_hospital: query["receiver_hospital"] = receiver_hospital
+    if record_id: query["record_id"] = record_id
+    if cursor:
+        query = {"$and": [query, decode_cursor(cursor, "timestamp")]}
+
+    logs = await db["audit_logs"].find(query) \
+        .sort([("timestamp", -1), ("_id", -1)]) \
+        .limit(limit + 1) \
+        .to_list(limit + 1)
+    if len(logs) > limit:
+        logs = logs[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(logs[-1], "timestamp")
+
+    for log in logs:
+        log["id"] = str(log.pop("_id"))
+    return logs
+
+@router.get("/audit-rollups")
+async def get_audit_rollups(
+    start_day: Optional[str] = Query(None, description="YYYY-MM-DD (inclusive)"),
+    end_day: Optional[str] = Query(None, description="YYYY-MM-DD (inclusive)"),
+    hospital: Optional[str] = Query(None),
+    current_user: dict = Depends(get_current_user_claims),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Per-hospital, per-day transfer counts (sent / received) for the national dashboard."""
+    require_government(current_user)
+
+    query = {}
+    if start_day or end_day:
+        query["day"] = {}
+        if start_day: query["day"]["$gte"] = start_day
+        if end_day: query["day"]["$lte"] = end_day
+    if hospital: query["hospital"] = hospital
 
-    return {"status": "success", "message": "Patient accepted into your database"}
\ No newline at end of file
+    return await db["audit_rollups"].find(query, {"_id": 0}).sort([("day", 1), ("hospital", 1)]).to_list(1000)
@@ -1,3 +1,5 @@
+import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +8,100 @@ class Settings(BaseSettings):
     DB_NAME: str = "hospital_db"
     SECRET_KEY: str = "secret"
 
+    # QKD key pool (pre-generated keys handed out to request handlers)
+    QKD_KEY_POOL_SIZE: int = 512
+    QKD_KEY_POOL_REFILL_BATCH: int = 64
+
+    # QKD executor (process pool running the BB84 simulation)
+    QKD_EXECUTOR_WORKERS: int = 2
+    QKD_EXECUTOR_MAX_PENDING: int = 32
+
+    # Monte Carlo link analytics: own low-priority process pool (every core but one by
+    # default; niced, so it only takes CPU the API leaves idle), trials per job,
+    # qubit-trial budgets (per study and across running studies), trial limits and result cache
+    QKD_ANALYTICS_WORKERS: int = max(1, (os.cpu_count() or 2) - 1)
+    QKD_ANALYTICS_MAX_PENDING: int = 8
+    QKD_ANALYTICS_NICE: int = 10
+    QKD_ANALYTICS_CHUNK_TRIALS: int = 50
+    QKD_ANALYTICS_MAX_QUBIT_TRIALS: int = 100_000_000
+    QKD_ANALYTICS_MAX_QUBIT_TRIALS_INFLIGHT: int = 200_000_000
+    QKD_ANALYTICS_MAX_TRIALS: int = 5000
+    QKD_ANALYTICS_MAX_QUBITS: int = 262144
+    QKD_ANALYTICS_MAX_POINTS: int = 48
+    QKD_ANALYTICS_CACHE_SIZE: int = 256
+    QKD_ANALYTICS_CACHE_TTL_SECONDS: int = 3600
+
+    # Password hashing (bcrypt) thread pool and admission limit
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # In-memory copy of the hospitals registry (target-hospitals, directory)
+    HOSPITAL_REGISTRY_TTL_SECONDS: int = 300
+
+    # Record decryption thread pool; pages smaller than the threshold decrypt inline
+    DECRYPT_WORKERS: int = 4
+    DECRYPT_PARALLEL_THRESHOLD: int = 200
+
+    # Resolved-user cache for get_current_user
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    # Read-only endpoints trust the role/hospital/abha claims in the JWT (no DB lookup)
+    AUTH_CLAIMS_ONLY: bool = False
+
+    # Patient identity cache (ABHA/email -> user) for record writes
+    IDENTITY_CACHE_SIZE: int = 10000
+    IDENTITY_CACHE_TTL_SECONDS: int = 30
+
+    # /api/records/my-records page size (default and upper bound)
+    RECORDS_PAGE_SIZE: int = 100
+    RECORDS_PAGE_SIZE_MAX: int = 500
+
+    # /api/doctors/ directory page size (default and upper bound)
+    DOCTORS_PAGE_SIZE: int = 50
+    DOCTORS_PAGE_SIZE_MAX: int = 200
+
+    # Buffered audit-log writer: queue bound, flush size and max wait
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 0.5
+    AUDIT_RETRY_INTERVAL_SECONDS: float = 5.0
+    AUDIT_SPILL_PATH: str = "audit_spill.jsonl"
+
+    # /api/transfer/inbox/stream: per-connection event buffer, keep-alive interval
+    # and lifetime of the ticket that opens a stream
+    INBOX_STREAM_QUEUE_SIZE: int = 100
+    INBOX_STREAM_KEEPALIVE_SECONDS: int = 15
+    INBOX_STREAM_TICKET_SECONDS: int = 60
+    # Feed inbox events from a MongoDB change stream (needs a replica set;
+    # reaches streams held by every uvicorn worker)
+    INBOX_CHANGE_STREAM: bool = False
+
+    # /api/transfer/audit-logs page size (default and upper bound)
+    AUDIT_PAGE_SIZE: int = 100
+    AUDIT_PAGE_SIZE_MAX: int = 500
+
+    # Also read the old per-hospital inbox_* collections (until the inbox migration has run)
+    TRANSFER_INBOX_LEGACY_READS: bool = True
+
+    # AI triage: "local" (in-process TF-IDF engine) or "remote" (hosted zero-shot model)
+    AI_BACKEND: str = "local"
+    AI_BATCH_REQUEST_MAX: int = 1000        # texts per /predict-department/batch call
+    # Remote zero-shot department classifier
+    HF_TOKEN: Optional[str] = None
+    AI_INFERENCE_URL: str = "https://router.huggingface.co/models/facebook/bart-large-mnli"
+    AI_POOL_SIZE: int = 8                   # keep-alive connections / HTTP threads
+    AI_CONNECT_TIMEOUT_SECONDS: float = 3
+    AI_TIMEOUT_SECONDS: float = 10
+    AI_BATCH_MAX: int = 16                  # texts per batched inference call
+    AI_BATCH_WINDOW_MS: float = 10          # how long a request waits for company
+    AI_BREAKER_FAILURES: int = 5            # consecutive errors before the circuit opens
+    AI_BREAKER_RESET_SECONDS: float = 30
+    AI_CACHE_SIZE: int = 5000
+    AI_CACHE_TTL_SECONDS: int = 3600
+
+    # Run resumable data migrations (e.g. records -> storage format v2) in the background
+    RUN_MIGRATIONS_ON_STARTUP: bool = False
+
     class Config:
         # This tells it to look for .env in the backend root
         env_file = ".env"
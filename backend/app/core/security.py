@@ -3,9 +3,13 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 from passlib.context import CryptContext
 from jose import jwt
-import secrets
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
 
+from app.core.config import settings
+from app.utils.executors import BoundedExecutor
+from app.utils.quantum import run_bb84_session
+
 # --- 1. CONFIGURATION ---
 # Setup Password Hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -22,6 +26,41 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# --- 2b. OFF-LOOP PASSWORD HASHING ---
+# bcrypt costs tens to hundreds of ms of CPU per call. It runs in a small,
+# dedicated thread pool (bcrypt releases the GIL) behind an admission limit,
+# so a login storm is refused quickly instead of stalling the event loop.
+
+class PasswordHasherBusy(Exception):
+    """Raised when more hashing jobs are pending than the admission limit."""
+
+
+class PasswordHasher(BoundedExecutor):
+    busy_error = PasswordHasherBusy
+    job_name = "password hashing jobs"
+
+    # --- Lifecycle (called from the lifespan hook) ---
+    def start(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            self._started = True
+
+    def stop(self):
+        self._shutdown_pool()
+
+    # --- Jobs ---
+    async def hash(self, password: str) -> str:
+        return await self.run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -38,60 +77,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 class QKDProtocol:
     """
     Simulates the BB84 Quantum Key Distribution protocol.
+    Delegates to the shared bit-packed engine in app.utils.quantum.
     """
     def __init__(self, num_bits: int = 256):
         self.num_bits = num_bits  # Length of the raw bit stream
 
-    def _generate_quantum_bits(self):
-        """Generates random bits (0 or 1) and random bases (+ or x)."""
-        bits = [secrets.randbelow(2) for _ in range(self.num_bits)]
-        bases = [secrets.randbelow(2) for _ in range(self.num_bits)]
-        return bits, bases
-
-    def _measure_bits(self, sender_bases, receiver_bases, sender_bits):
-        """Simulates measurement. If bases match, bit is kept."""
-        measured_bits = []
-        for s_base, r_base, bit in zip(sender_bases, receiver_bases, sender_bits):
-            if s_base == r_base:
-                measured_bits.append(bit)
-            else:
-                # Random outcome (Heisenberg Uncertainty)
-                measured_bits.append(secrets.randbelow(2))
-        return measured_bits
-
-    def _sifting(self, sender_bases, receiver_bases, measured_bits):
-        """Sifting Phase: Keep bits where bases matched."""
-        sifted_key = []
-        for s_base, r_base, bit in zip(sender_bases, receiver_bases, measured_bits):
-            if s_base == r_base:
-                sifted_key.append(bit)
-        return sifted_key
-
     def execute_bb84_protocol(self) -> Dict[str, Any]:
-        """Runs the full BB84 simulation loop."""
-        
-        # 1. Alice prepares qubits
-        alice_bits, alice_bases = self._generate_quantum_bits()
-
-        # 2. Bob generates his measuring bases
-        bob_bases = [secrets.randbelow(2) for _ in range(self.num_bits)]
-
-        # 3. Transmission & Measurement
-        bob_measured_bits = self._measure_bits(alice_bases, bob_bases, alice_bits)
-
-        # 4. Sifting
-        sifted_key_bits = self._sifting(alice_bases, bob_bases, bob_measured_bits)
-
-        # 5. Key Generation
-        key_string = "".join(map(str, sifted_key_bits))
-        final_key_hash = hashlib.sha256(key_string.encode()).hexdigest()
-        shared_key_bytes = hashlib.sha256(key_string.encode()).digest()
-        
-        # 6. Return Result (With the fix for your KeyError)
+        """Runs the full BB84 simulation (prepare, measure, sift, hash)."""
+        sifted_key, sifted_count = run_bb84_session(self.num_bits)
+        digest = hashlib.sha256(sifted_key.tobytes())
+
         return {
-            "shared_key": shared_key_bytes,
-            "final_key_hash": final_key_hash,
-            "raw_bits_length": self.num_bits,      # 👈 The fix is here!
-            "sifted_bits_count": len(sifted_key_bits),
+            "shared_key": digest.digest(),
+            "final_key_hash": digest.hexdigest(),
+            "raw_bits_length": self.num_bits,
+            "sifted_bits_count": sifted_count,
             "protocol": "BB84 (Simulated)"
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+# ---------------------------------------------------------
+# 🏥 HOSPITAL REGISTRY (Materialized from users, kept up to date by register)
+# ---------------------------------------------------------
+# One small document per hospital: {_id: name, doctor_count, user_count}.
+# Replaces users.distinct("hospital") scans on the transfer screens.
+
+_ALL = "all"
+
+class HospitalRegistry:
+    def __init__(self, ttl: float):
+        # Single entry (the whole registry); each uvicorn worker keeps its own
+        self.cache = TTLCache(maxsize=1, ttl=ttl)
+
+    async def rebuild(self, db):
+        """Recomputes the registry from the users collection (first run, or repair)."""
+        pipeline = [
+            {"$match": {"hospital": {"$nin": [None, "", "Unknown"]}}},
+            {"$group": {
+                "_id": "$hospital",
+                "user_count": {"$sum": 1},
+                "doctor_count": {"$sum": {"$cond": [{"$eq": ["$role", "doctor"]}, 1, 0]}},
+            }},
+        ]
+        hospitals = await db["users"].aggregate(pipeline).to_list(None)
+        for h in hospitals:
+            h["updated_at"] = datetime.utcnow()
+            await db["hospitals"].replace_one({"_id": h["_id"]}, h, upsert=True)
+        self.invalidate()
+        print(f"🏥 Hospital registry rebuilt: {len(hospitals)} hospitals")
+        return hospitals
+
+    async def ensure(self, db):
+        """Startup: builds the registry once if it has never been populated."""
+        if not await db["hospitals"].estimated_document_count():
+            await self.rebuild(db)
+
+    async def add_user(self, db, hospital: str, role: str):
+        """Called by register for every new user that names a hospital."""
+        if not hospital or hospital == "Unknown":
+            return
+        await db["hospitals"].update_one(
+            {"_id": hospital},
+            {
+                "$inc": {"user_count": 1, "doctor_count": 1 if role == "doctor" else 0},
+                "$set": {"updated_at": datetime.utcnow()},
+            },
+            upsert=True
+        )
+        self.invalidate()
+
+    async def all(self, db) -> dict:
+        """Hospital name -> {doctor_count, user_count}, from cache when fresh."""
+        hospitals = self.cache.get(_ALL)
+        if hospitals is None:
+            docs = await db["hospitals"].find({}).to_list(None)
+            hospitals = {
+                d["_id"]: {"doctor_count": d.get("doctor_count", 0), "user_count": d.get("user_count", 0)}
+                for d in docs
+            }
+            self.cache.set(_ALL, hospitals)
+        return hospitals
+
+    async def targets(self, db, my_hospital: str) -> list:
+        """Every registered hospital except the caller's."""
+        return sorted(h for h in await self.all(db) if h != my_hospital)
+
+    def invalidate(self):
+        self.cache.invalidate(_ALL)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+hospital_registry = HospitalRegistry(ttl=settings.HOSPITAL_REGISTRY_TTL_SECONDS)
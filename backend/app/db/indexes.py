@@ -0,0 +1,193 @@
+from datetime import datetime
+from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
+
+from app.utils.pagination import encode_cursor, decode_cursor
+
+# ---------------------------------------------------------
+# 📇 INDEX MANAGER (Declared once, applied idempotently at startup)
+# ---------------------------------------------------------
+
+# All transfer packets, partitioned by target_hospital
+TRANSFER_INBOX = "transfer_inbox"
+# Legacy per-hospital inbox collections (read during the cutover only)
+INBOX_PREFIX = "inbox_"
+
+# Every index the hot paths rely on, per collection
+INDEX_SPECS = {
+    "users": [
+        # login / get_current_user / create_record patient lookup
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel(
+            [("abha_number", ASCENDING)], name="abha_number_unique", unique=True,
+            partialFilterExpression={"abha_number": {"$type": "string"}}
+        ),
+        # get_doctors_by_hospital: both cover the directory projection (email is the
+        # cursor tiebreak and the doctor id), so listings never fetch user documents.
+        # Without a specialization filter the (full_name, email) order only comes
+        # from the first; the second serves ?specialization= listings
+        IndexModel(
+            [("role", ASCENDING), ("hospital", ASCENDING), ("full_name", ASCENDING),
+             ("email", ASCENDING), ("specialization", ASCENDING)],
+            name="role_hospital_name"
+        ),
+        IndexModel(
+            [("role", ASCENDING), ("hospital", ASCENDING), ("specialization", ASCENDING),
+             ("full_name", ASCENDING), ("email", ASCENDING)],
+            name="role_hospital_specialization_name"
+        ),
+    ],
+    "records": [
+        # get_my_records: doctor (hospital silo) and patient/government (ABHA) views
+        # (created_at, _id) is the keyset pagination order
+        IndexModel([("hospital", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="hospital_created_at_id"),
+        IndexModel([("patient_abha", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="patient_abha_created_at_id"),
+        IndexModel([("patient_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="patient_id_created_at_id"),
+    ],
+    "audit_logs": [
+        # /api/transfer/audit-logs: (timestamp, _id) is the keyset pagination order;
+        # a hospital filter is an equality prefix in front of it
+        IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING)], name="timestamp_id"),
+        IndexModel([("sender_hospital", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], name="sender_timestamp_id"),
+        IndexModel([("receiver_hospital", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], name="receiver_timestamp_id"),
+        # record_id filter (a single record's transfer trail)
+        IndexModel([("record_id", ASCENDING)], name="record_id"),
+    ],
+    "audit_rollups": [
+        # one counter document per (day, hospital)
+        IndexModel([("day", ASCENDING), ("hospital", ASCENDING)], name="day_hospital", unique=True),
+    ],
+    TRANSFER_INBOX: [
+        # get_my_hospital_inbox / accept_transfer
+        IndexModel(
+            [("target_hospital", ASCENDING), ("status", ASCENDING), ("received_at", DESCENDING)],
+            name="target_status_received_at"
+        ),
+        # execute-batch duplicate check
+        IndexModel(
+            [("target_hospital", ASCENDING), ("original_record_id", ASCENDING), ("data_signature", ASCENDING)],
+            name="target_record_signature"
+        ),
+    ],
+}
+
+# Applied to every legacy inbox_* collection still awaiting migration
+INBOX_INDEX_SPECS = [
+    # execute-batch duplicate check
+    IndexModel([("original_record_id", ASCENDING), ("data_signature", ASCENDING)], name="record_signature"),
+    # get_my_hospital_inbox
+    IndexModel([("received_at", DESCENDING)], name="received_at"),
+]
+
+# Superseded indexes, dropped by ensure_indexes (they only slow down writes)
+RETIRED_INDEXES = {
+    # could not serve the (timestamp, _id) sort: every audit-logs page sorted in memory
+    "audit_logs": ["timestamp_sender_receiver"],
+}
+
+def _specs_for(collection_name):
+    if collection_name.startswith(INBOX_PREFIX):
+        return INBOX_INDEX_SPECS
+    return INDEX_SPECS.get(collection_name, [])
+
+async def _inbox_collections(db):
+    return await db.list_collection_names(filter={"name": {"$regex": f"^{INBOX_PREFIX}"}})
+
+async def ensure_indexes(db):
+    """
+    Creates every declared index and drops retired ones. Safe to run on each
+    startup: existing indexes with the same spec are left alone. One failing
+    index (e.g. a unique index over duplicate data) is reported without
+    blocking the rest.
+    """
+    collections = list(INDEX_SPECS) + await _inbox_collections(db)
+    for name in collections:
+        for spec in _specs_for(name):
+            try:
+                await db[name].create_indexes([spec])
+            except Exception as e:
+                print(f"❌ Index {name}.{spec.document['name']} not created: {e}")
+    for name, retired in RETIRED_INDEXES.items():
+        existing = await db[name].index_information()
+        for index in retired:
+            if index in existing:
+                await db[name].drop_index(index)
+                print(f"📇 Dropped retired index {name}.{index}")
+    print(f"📇 Indexes ensured on {len(collections)} collections")
+
+async def index_report(db):
+    """
+    Per collection: declared indexes that are missing, and existing indexes
+    with no recorded use since the server started ($indexStats).
+    """
+    report = {}
+    for name in list(INDEX_SPECS) + await _inbox_collections(db):
+        declared = {spec.document["name"] for spec in _specs_for(name)}
+        existing = set((await db[name].index_information()).keys())
+
+        unused = []
+        async for stat in db[name].aggregate([{"$indexStats": {}}]):
+            if stat["name"] != "_id_" and stat["accesses"]["ops"] == 0:
+                unused.append(stat["name"])
+
+        report[name] = {
+            "missing": sorted(declared - existing),
+            "unused": sorted(unused),
+        }
+    return report
+
+# ---------------------------------------------------------
+# HOT QUERIES (the shapes explain() should show using an index)
+# ---------------------------------------------------------
+HOT_QUERIES = [
+    ("login by email", "users", {"email": "doctor@example.com"}, None),
+    ("login by ABHA", "users", {"abha_number": "12345678901234"}, None),
+    ("doctors by hospital", "users", {"role": "doctor", "hospital": "hospitalA"}, [("full_name", ASCENDING), ("email", ASCENDING)]),
+    ("doctors by specialization", "users", {"role": "doctor", "hospital": "hospitalA", "specialization": "Cardiology"}, [("full_name", ASCENDING), ("email", ASCENDING)]),
+    ("audit logs", "audit_logs", {}, [("timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ("audit logs by time", "audit_logs",
+     {"timestamp": {"$gte": datetime(2025, 1, 1)}}, [("timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ("audit logs by sender", "audit_logs",
+     {"timestamp": {"$gte": datetime(2025, 1, 1)}, "sender_hospital": "hospitalA"}, [("timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ("audit logs by receiver", "audit_logs",
+     {"receiver_hospital": "hospitalB"}, [("timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ("audit logs next page", "audit_logs",
+     {"$and": [{"sender_hospital": "hospitalA"}, decode_cursor(encode_cursor(
+         {"timestamp": datetime(2025, 6, 1), "_id": ObjectId("0" * 24)}, "timestamp"), "timestamp")]},
+     [("timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ("audit rollups", "audit_rollups", {"day": {"$gte": "2025-01-01"}}, [("day", ASCENDING)]),
+    ("inbox listing", TRANSFER_INBOX, {"target_hospital": "hospitala", "status": "LOCKED"}, [("received_at", DESCENDING)]),
+    ("inbox duplicate check", TRANSFER_INBOX,
+     {"target_hospital": "hospitala", "original_record_id": {"$in": ["000000000000000000000000"]},
+      "data_signature": {"$in": ["0" * 64]}}, None),
+    ("doctor records", "records", {"hospital": "hospitalA"}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("patient records", "records", {"patient_abha": "12345678901234"}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("patient records by id", "records", {"patient_id": "000000000000000000000000"}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+]
+
+def _plan_stages(plan):
+    """Flattens the stage names of an explain() plan tree."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for key in ("inputStage", "queryPlan", "innerStage", "outerStage"):
+            stages += _plan_stages(plan.get(key))
+        for child in plan.get("inputStages", []):
+            stages += _plan_stages(child)
+    return stages
+
+async def explain_hot_queries(db):
+    """
+    Runs explain() on every hot query. Returns (name, stages, indexed):
+    indexed means neither a collection scan nor a blocking in-memory SORT.
+    """
+    results = []
+    for name, collection, query, sort in HOT_QUERIES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+        stages = _plan_stages(plan)
+        results.append((name, stages, "COLLSCAN" not in stages and "SORT" not in stages))
+    return results
@@ -0,0 +1,253 @@
+import asyncio
+import sys
+import bson
+from datetime import datetime
+from pymongo import UpdateOne, ReplaceOne
+
+from app.db.indexes import TRANSFER_INBOX, INBOX_PREFIX
+from app.utils.audit_writer import audit_writer
+from app.utils.encryption import (
+    decrypt_many_checked, decrypt_records, seal_record_fields, key_to_binary, to_key_id, content_signature,
+    SEALED_FIELDS, undecryptable
+)
+
+# ---------------------------------------------------------
+# 🔁 DATA MIGRATIONS (Resumable, batch by batch)
+# ---------------------------------------------------------
+# Progress is checkpointed in the 'migrations' collection after every
+# batch, so an interrupted run picks up where it stopped.
+
+async def _load_state(db, name):
+    return await db["migrations"].find_one({"_id": name}) or {"_id": name}
+
+async def _save_state(db, state):
+    state["updated_at"] = datetime.utcnow()
+    await db["migrations"].replace_one({"_id": state["_id"]}, state, upsert=True)
+
+async def migrate_records_to_v2(db, batch_size: int = 500):
+    """
+    Converts v1 records (Fernet text per field, hex key) to storage format v2
+    (one AES-GCM blob per record, binary key). Reports bytes saved.
+    """
+    state = await _load_state(db, "records_v2")
+    if state.get("done"):
+        return state
+    state.setdefault("converted", 0)
+    state.setdefault("failed", 0)
+    state.setdefault("bytes_before", 0)
+    state.setdefault("bytes_after", 0)
+
+    while True:
+        query = {"storage_format": {"$ne": 2}, "quantum_key": {"$exists": True}}
+        if state.get("last_id"):
+            query["_id"] = {"$gt": state["last_id"]}
+        batch = await db["records"].find(query).sort("_id", 1).to_list(batch_size)
+        if not batch:
+            break
+
+        # A missing field fails to decrypt (the record counts as failed) instead of raising
+        plain, ok = decrypt_many_checked(
+            [(doc.get(name), doc["quantum_key"]) for doc in batch for name in SEALED_FIELDS]
+        )
+
+        ops = []
+        for i, doc in enumerate(batch):
+            if not all(ok[2 * i:2 * i + 2]):
+                state["failed"] += 1
+                continue
+            fields = dict(zip(SEALED_FIELDS, plain[2 * i:2 * i + 2]))
+
+            key_hex = to_key_id(doc["quantum_key"])
+            upgrade = {
+                "sealed_fields": seal_record_fields(fields, key_hex),
+                "storage_format": 2,
+                "quantum_key": key_to_binary(key_hex),
+            }
+            converted = {k: v for k, v in doc.items() if k not in SEALED_FIELDS}
+            converted.update(upgrade)
+
+            state["bytes_before"] += len(bson.encode(doc))
+            state["bytes_after"] += len(bson.encode(converted))
+            ops.append(UpdateOne(
+                {"_id": doc["_id"], "storage_format": {"$ne": 2}},
+                {"$set": upgrade, "$unset": {name: "" for name in SEALED_FIELDS}}
+            ))
+
+        if ops:
+            result = await db["records"].bulk_write(ops, ordered=False)
+            state["converted"] += result.modified_count
+
+        state["last_id"] = batch[-1]["_id"]
+        await _save_state(db, state)
+        print(f"🔁 records_v2: {state['converted']} converted, "
+              f"{state['bytes_before'] - state['bytes_after']} bytes saved so far")
+
+    state["done"] = True
+    state["bytes_saved"] = state["bytes_before"] - state["bytes_after"]
+    await _save_state(db, state)
+    return state
+
+async def migrate_inboxes_to_transfer_inbox(db, batch_size: int = 500):
+    """
+    Moves packets from the per-hospital inbox_* collections into the single
+    transfer_inbox collection (same _id, target_hospital taken from the
+    collection name), then drops each emptied collection. Packets are
+    upserted by _id, so re-running after an interruption is safe.
+    """
+    state = await _load_state(db, "transfer_inbox")
+    state.setdefault("moved", 0)
+    state.setdefault("collections_dropped", 0)
+
+    legacy = await db.list_collection_names(filter={"name": {"$regex": f"^{INBOX_PREFIX}"}})
+    for name in legacy:
+        key = name[len(INBOX_PREFIX):]
+        while True:
+            batch = await db[name].find().sort("_id", 1).to_list(batch_size)
+            if not batch:
+                break
+            await db[TRANSFER_INBOX].bulk_write([
+                ReplaceOne({"_id": doc["_id"]}, {**doc, "target_hospital": key, "status": doc.get("status", "LOCKED")}, upsert=True)
+                for doc in batch
+            ], ordered=False)
+            # Packets accepted from the legacy collection since the batch was
+            # read are gone from it; drop their fresh copies so they can't be
+            # accepted twice. (From here on, accept deletes both copies.)
+            ids = [doc["_id"] for doc in batch]
+            still_there = {doc["_id"] async for doc in db[name].find({"_id": {"$in": ids}}, {"_id": 1})}
+            accepted = [i for i in ids if i not in still_there]
+            if accepted:
+                await db[TRANSFER_INBOX].delete_many({"_id": {"$in": accepted}})
+            await db[name].delete_many({"_id": {"$in": list(still_there)}})
+            state["moved"] += len(still_there)
+            await _save_state(db, state)
+
+        await db.drop_collection(name)
+        state["collections_dropped"] += 1
+        await _save_state(db, state)
+        print(f"🔁 transfer_inbox: {name} migrated, {state['moved']} packets moved so far")
+
+    state["done"] = True
+    await _save_state(db, state)
+    return state
+
+async def rebuild_audit_rollups(db, force: bool = False):
+    """
+    Computes the per-hospital, per-day counters in 'audit_rollups' from the
+    whole audit_logs collection (logs written before rollups existed). From
+    then on the audit writer keeps them current. Runs once as a migration;
+    call with force=True (python -m app.db.migrations --rebuild-rollups) to
+    repair drift. Counts are set, not added, so this process's audit writer
+    is paused meanwhile; its $inc updates would otherwise race the $set.
+    Run the forced rebuild while no other API process is writing audit logs.
+    """
+    state = await _load_state(db, "audit_rollups")
+    if state.get("done") and not force:
+        return state
+
+    async with audit_writer.paused():
+        counts = {}
+        for field, direction in (("sender_hospital", "sent"), ("receiver_hospital", "received")):
+            pipeline = [{"$group": {
+                "_id": {"day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}}, "hospital": f"${field}"},
+                "n": {"$sum": 1},
+            }}]
+            async for row in db["audit_logs"].aggregate(pipeline):
+                pair = (row["_id"]["day"], row["_id"]["hospital"])
+                counts.setdefault(pair, {"sent": 0, "received": 0})[direction] = row["n"]
+
+        # Counters with no logs left behind them (drift) go back to zero
+        async for doc in db["audit_rollups"].find({}, {"_id": 0, "day": 1, "hospital": 1}):
+            counts.setdefault((doc["day"], doc["hospital"]), {"sent": 0, "received": 0})
+
+        ops = [
+            UpdateOne({"day": day, "hospital": hospital}, {"$set": totals}, upsert=True)
+            for (day, hospital), totals in counts.items()
+        ]
+        if ops:
+            await db["audit_rollups"].bulk_write(ops, ordered=False)
+
+    state["rollups"] = len(ops)
+    state["done"] = True
+    await _save_state(db, state)
+    return state
+
+async def backfill_data_signatures(db, batch_size: int = 500):
+    """
+    Stores data_signature on records written before it was computed at write
+    time, so execute-batch dedup never has to decrypt them. Records that
+    can't be decrypted or have no diagnosis are counted as failed and left
+    unsigned (execute-batch refuses to send them).
+    """
+    state = await _load_state(db, "data_signatures")
+    if state.get("done"):
+        return state
+    state.setdefault("signed", 0)
+    state.setdefault("failed", 0)
+
+    while True:
+        query = {"data_signature": {"$exists": False}}
+        if state.get("last_id"):
+            query["_id"] = {"$gt": state["last_id"]}
+        batch = await db["records"].find(query).sort("_id", 1).to_list(batch_size)
+        if not batch:
+            break
+
+        decrypt_records(batch)
+
+        ops = []
+        for doc in batch:
+            # Nothing to fingerprint; retrying would fail on this batch every start
+            if undecryptable(doc) or doc.get("diagnosis") is None:
+                state["failed"] += 1
+                continue
+            ops.append(UpdateOne(
+                {"_id": doc["_id"], "data_signature": {"$exists": False}},
+                {"$set": {"data_signature": content_signature(doc.get("patient_id"), doc["diagnosis"])}}
+            ))
+
+        if ops:
+            result = await db["records"].bulk_write(ops, ordered=False)
+            state["signed"] += result.modified_count
+
+        state["last_id"] = batch[-1]["_id"]
+        await _save_state(db, state)
+        print(f"🔁 data_signatures: {state['signed']} records signed so far")
+
+    state["done"] = True
+    await _save_state(db, state)
+    return state
+
+async def run_background_migrations(db):
+    """Entry point for the lifespan hook. Errors are logged, never raised."""
+    try:
+        report = await migrate_records_to_v2(db)
+        print(f"✅ records_v2 migration: {report['converted']} converted, "
+              f"{report['failed']} failed, {report['bytes_saved']} bytes saved")
+        report = await migrate_inboxes_to_transfer_inbox(db)
+        print(f"✅ transfer_inbox migration: {report['moved']} packets moved, "
+              f"{report['collections_dropped']} inbox collections dropped")
+        report = await rebuild_audit_rollups(db)
+        print(f"✅ audit_rollups: {report['rollups']} day/hospital counters")
+        report = await backfill_data_signatures(db)
+        print(f"✅ data_signatures: {report['signed']} records signed, {report['failed']} failed")
+    except asyncio.CancelledError:
+        print("⏸️ Migrations paused (will resume on next start)")
+        raise
+    except Exception as e:
+        print(f"❌ Migration error: {e}")
+
+
+if __name__ == "__main__":
+    # Run once from the backend folder: python -m app.db.migrations
+    from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+
+    async def main():
+        await connect_to_mongo()
+        if "--rebuild-rollups" in sys.argv:
+            report = await rebuild_audit_rollups(await get_database(), force=True)
+            print(f"✅ audit_rollups rebuilt: {report['rollups']} day/hospital counters")
+        else:
+            await run_background_migrations(await get_database())
+        await close_mongo_connection()
+
+    asyncio.run(main())
@@ -1,18 +1,31 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
+from app.db.indexes import ensure_indexes
 
 class Database:
     client: AsyncIOMotorClient = None
+    transactions: bool = None  # Replica set / sharded cluster? (checked once)
 
 db = Database()
 
 async def get_database():
     return db.client[settings.DB_NAME]
 
+async def supports_transactions() -> bool:
+    """Multi-document transactions need a replica set or a sharded cluster."""
+    if db.transactions is None:
+        try:
+            hello = await db.client.admin.command("hello")
+            db.transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+        except Exception:
+            db.transactions = False
+    return db.transactions
+
 async def connect_to_mongo():
     try:
         db.client = AsyncIOMotorClient(settings.MONGODB_URL)
         print("✅ Connected to MongoDB")
+        await ensure_indexes(db.client[settings.DB_NAME])
     except Exception as e:
         print(f"❌ Error connecting to MongoDB: {e}")
 
@@ -1,8 +1,20 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.db.migrations import run_background_migrations
+from app.db.hospitals import hospital_registry
+from app.utils.qkd_executor import qkd_executor
+from app.utils.key_pool import key_pool
+from app.utils.qkd_analytics import qkd_analytics
+from app.core.security import password_hasher
+from app.utils.decrypt_pool import decryption_pool
+from app.utils.audit_writer import audit_writer
+from app.utils.inbox_events import inbox_broker
+from app.utils.ai_client import ai_client
+from app.utils.triage_engine import local_engine
 
 # --- Import All Routers ---
 from app.api.auth import router as auth_router
@@ -11,6 +23,8 @@ from app.api.transfer import router as transfer_router
 from app.api.abha import router as abha_router
 from app.api.ai import router as ai_router 
 from app.api.doctors import router as doctors_router # 👈 NEW IMPORT
+from app.api.metrics import router as metrics_router
+from app.api.analytics import router as analytics_router
 
 # --- Lifespan: Handles startup and shutdown ---
 @asynccontextmanager
@@ -18,8 +32,38 @@ async def lifespan(app: FastAPI):
     # Startup: Connect to DB
     await connect_to_mongo()
     print("✅ Database Connected")
+    await hospital_registry.ensure(await get_database())
+    # Startup: bcrypt and record-decryption thread pools
+    password_hasher.start()
+    decryption_pool.start()
+    # Startup: AI triage (local engine vectors, pooled HTTP client for the remote model)
+    local_engine.load()
+    ai_client.start()
+    # Startup: QKD worker processes, then begin pre-generating keys
+    await qkd_executor.start()
+    await key_pool.start()
+    await qkd_analytics.start()   # separate low-priority pool for link studies
+    # Startup: Buffered audit-log writer
+    await audit_writer.start()
+    # Startup: Optional change-stream source for inbox events
+    await inbox_broker.start(await get_database())
+    # Startup: Optional background data migrations (resumable)
+    migration_task = None
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        migration_task = asyncio.create_task(run_background_migrations(await get_database()))
     yield
-    # Shutdown: Close DB
+    # Shutdown: Pause migrations, drain audit entries, stop key refill and QKD workers, then close DB
+    if migration_task is not None:
+        migration_task.cancel()
+        await asyncio.gather(migration_task, return_exceptions=True)
+    await inbox_broker.stop()
+    await audit_writer.stop()   # drains queued audit entries
+    await key_pool.stop()
+    await qkd_executor.stop()
+    await qkd_analytics.stop()
+    await ai_client.stop()
+    decryption_pool.stop()
+    password_hasher.stop()
     await close_mongo_connection()
     print("❌ Database Disconnected")
 
@@ -44,6 +88,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "ETag"],
 )
 
 # --- Register Routers ---
@@ -53,6 +98,8 @@ app.include_router(transfer_router, prefix="/api/transfer", tags=["QKD Transfer"
 app.include_router(abha_router, prefix="/api/abha", tags=["ABHA Integration"])
 app.include_router(ai_router, prefix="/api", tags=["AI Triage"]) 
 app.include_router(doctors_router, prefix="/api/doctors", tags=["Doctor Directory"]) # 👈 NEW ROUTE
+app.include_router(metrics_router, prefix="/api/metrics", tags=["Metrics"])
+app.include_router(analytics_router, prefix="/api/qkd", tags=["QKD Analytics"])
 
 # --- Root Endpoint ---
 @app.get("/")
@@ -60,7 +107,7 @@ def read_root():
     return {
         "status": "System Online", 
         "database": settings.DB_NAME, 
-        "modules": ["Auth", "Records", "QKD Transfer", "ABHA", "AI", "Doctors"]
+        "modules": ["Auth", "Records", "QKD Transfer", "ABHA", "AI", "Doctors", "Metrics"]
     }
 
 if __name__ == "__main__":
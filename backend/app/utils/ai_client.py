@@ -0,0 +1,250 @@
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+# ---------------------------------------------------------
+# 🧠 AI TRIAGE CLIENT (Pooled, batched, cached inference calls)
+# ---------------------------------------------------------
+# HTTP runs on a small thread pool, so the event loop never waits on the
+# network. requests doesn't promise a Session is thread-safe, so each
+# thread keeps its own Session (and with it one keep-alive connection).
+# Concurrent requests arriving within a short window share one batched
+# call; answers are cached by normalized diagnosis text.
+
+DEPARTMENTS = ["Cardiology", "Neurology", "Orthopedics", "General Medicine", "Pediatrics", "Dermatology", "Psychiatry"]
+
+class AIUnavailable(Exception):
+    """The inference service is failing (circuit open) or returned an error."""
+
+def normalize_text(text: str) -> str:
+    # Case, spacing and trailing punctuation don't change the department
+    return re.sub(r"\s+", " ", text).strip().strip(".,;:!?").lower()
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive errors and rejects calls for
+    `reset_seconds`; then lets one trial call through (half-open).
+    """
+    def __init__(self, failures: int, reset_seconds: float):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.consecutive_failures >= self.failures:
+            if self.state != "open":
+                self.opened += 1
+            self.opened_at = time.monotonic()
+
+class AITriageClient:
+    def __init__(self, url: str, token: str, pool_size: int, connect_timeout: float, timeout: float,
+                 batch_max: int, batch_window_ms: float, breaker: CircuitBreaker, cache: TTLCache):
+        self.url = url
+        self.token = token
+        self.pool_size = pool_size
+        self.timeouts = (connect_timeout, timeout)
+        self.batch_max = batch_max
+        self.batch_window = batch_window_ms / 1e3
+        self.breaker = breaker
+        self.cache = cache
+        self._local = threading.local()   # .session: this ai-http thread's Session
+        self._sessions = []               # every thread's Session, closed by stop()
+        self._sessions_lock = threading.Lock()
+        self._pool = None
+        self._pending = {}     # normalized text -> (text, [futures])
+        self._timer = None
+        self._inflight = set() # _send tasks; the loop itself only keeps weak references
+
+        self.calls = 0
+        self.batched_texts = 0
+        self.errors = 0
+        self.rejected = 0
+
+    # --- Lifecycle (called from the lifespan hook) ---
+    def start(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="ai-http")
+
+    async def stop(self):
+        # Nothing is left waiting: queued texts and in-flight batches fail fast
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        self._fail(batch, AIUnavailable("AI client shutting down"))
+        for task in self._inflight:
+            task.cancel()
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+
+    # --- Requests ---
+    async def classify(self, text: str) -> dict:
+        """{"recommended_department", "confidence"} for one diagnosis text."""
+        key = normalize_text(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        if key not in self._pending:
+            if not self.breaker.allow():
+                self.rejected += 1
+                raise AIUnavailable("AI service temporarily unavailable")
+            self._pending[key] = (text, [])
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key][1].append(future)
+
+        if len(self._pending) >= self.batch_max:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.batch_window, self._dispatch)
+        return await future
+
+    async def classify_many(self, texts: List[str]) -> List[dict]:
+        # Arrive together, so the micro-batcher sends them as one call
+        return await asyncio.gather(*[self.classify(t) for t in texts])
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    @staticmethod
+    def _fail(batch: dict, error: Exception):
+        for _, futures in batch.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def _send(self, batch: dict):
+        self.start()
+        keys = list(batch)
+        # Counters are only touched on the event loop, never from the ai-http threads
+        self.calls += 1
+        self.batched_texts += len(keys)
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self._pool, self._post, [batch[k][0] for k in keys])
+            self.breaker.record_success()
+        except asyncio.CancelledError:
+            self._fail(batch, AIUnavailable("AI client shutting down"))
+            raise
+        except Exception as e:
+            self.errors += 1
+            self.breaker.record_failure()
+            self._fail(batch, e if isinstance(e, AIUnavailable) else AIUnavailable(str(e)))
+            return
+
+        for key, result in zip(keys, results):
+            self.cache.set(key, result)
+            for future in batch[key][1]:
+                if not future.done():
+                    future.set_result(result)
+
+    def _thread_session(self) -> requests.Session:
+        # Runs on the ai-http threads: one Session each, created on first use
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if self.token:
+                session.headers["Authorization"] = f"Bearer {self.token}"
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def _post(self, texts: List[str]) -> List[dict]:
+        # Runs on the ai-http threads
+        response = self._thread_session().post(
+            self.url,
+            json={"inputs": texts, "parameters": {"candidate_labels": DEPARTMENTS}},
+            timeout=self.timeouts,
+        )
+        data = response.json()
+        if isinstance(data, dict):
+            if "error" in data:
+                raise AIUnavailable(f"HF Error: {data['error']}")
+            data = [data]  # a single input may come back unwrapped
+        if len(data) != len(texts):
+            raise AIUnavailable(f"Expected {len(texts)} results, got {len(data)}")
+        return [
+            {"recommended_department": item["labels"][0], "confidence": round(item["scores"][0] * 100, 1)}
+            for item in data
+        ]
+
+    # --- Metrics ---
+    def stats(self) -> dict:
+        return {
+            "running": self._pool is not None,
+            "circuit": self.breaker.state,
+            "circuit_opened": self.breaker.opened,
+            "calls": self.calls,
+            "mean_batch_size": round(self.batched_texts / self.calls, 2) if self.calls else 0.0,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "cache": self.cache.stats(),
+        }
+
+
+ai_client = AITriageClient(
+    url=settings.AI_INFERENCE_URL,
+    token=settings.HF_TOKEN,
+    pool_size=settings.AI_POOL_SIZE,
+    connect_timeout=settings.AI_CONNECT_TIMEOUT_SECONDS,
+    timeout=settings.AI_TIMEOUT_SECONDS,
+    batch_max=settings.AI_BATCH_MAX,
+    batch_window_ms=settings.AI_BATCH_WINDOW_MS,
+    breaker=CircuitBreaker(failures=settings.AI_BREAKER_FAILURES, reset_seconds=settings.AI_BREAKER_RESET_SECONDS),
+    cache=TTLCache(maxsize=settings.AI_CACHE_SIZE, ttl=settings.AI_CACHE_TTL_SECONDS),
+)
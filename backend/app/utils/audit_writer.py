@@ -0,0 +1,264 @@
+import asyncio
+import os
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import List
+
+from bson import json_util
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.db.mongodb import get_database
+from app.utils.executors import latency_summary
+from app.models.record import AuditLog
+
+# ---------------------------------------------------------
+# 🧾 BUFFERED AUDIT WRITER (Off the request path)
+# ---------------------------------------------------------
+
+DUPLICATE_KEY = 11000
+_STOP = object()   # queued by stop(): flush what came before it, then exit
+
+async def update_rollups(db, entries: list):
+    """
+    Adds a batch of audit entries to the per-hospital, per-day counters in
+    'audit_rollups' ({day, hospital, sent, received}), one upsert per pair.
+    """
+    counts = {}
+    for entry in entries:
+        day = entry["timestamp"].date().isoformat()
+        counts.setdefault((day, entry["sender_hospital"]), Counter())["sent"] += 1
+        counts.setdefault((day, entry["receiver_hospital"]), Counter())["received"] += 1
+
+    ops = [
+        UpdateOne(
+            {"day": day, "hospital": hospital},
+            {"$inc": {"sent": totals["sent"], "received": totals["received"]}},
+            upsert=True
+        )
+        for (day, hospital), totals in counts.items()
+    ]
+    if ops:
+        await db["audit_rollups"].bulk_write(ops, ordered=False)
+
+class AuditWriter:
+    """
+    Collects AuditLog entries on a bounded queue and writes them to
+    'audit_logs' with insert_many, once `batch_size` entries are waiting or
+    `flush_interval` seconds have passed. When the queue is full, write()
+    waits for room (backpressure) instead of dropping entries.
+
+    Entries that still can't be written after the retries are held and
+    retried with the next flush. Whatever is held at shutdown (or beyond
+    `max_queue` held entries) is appended to a spill file, which start()
+    loads back, so accepted entries are never dropped.
+    """
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float,
+                 retry_interval: float, spill_path: str):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.spill_path = spill_path
+        self._queue = None    # asyncio.Queue, created on the running loop in start()
+        self._task = None
+        self._held = []       # entries whose insert failed, retried first
+        self._lock = None     # asyncio.Lock, created on the running loop (see _flush_lock)
+
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.spilled = 0
+        self.backpressure_waits = 0
+        self._batch_sizes = deque(maxlen=1000)
+        self._flush_ms = deque(maxlen=1000)
+
+    # --- Lifecycle (called from the lifespan hook) ---
+    async def start(self):
+        if self._task is None:
+            self._held = self._load_spill() + self._held
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            # Drain: nothing accepted by write() is lost on shutdown
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+            while not self._queue.empty():
+                await self._flush(self._take_batch())
+        if self._held:
+            self._spill()
+
+    @property
+    def _flush_lock(self) -> asyncio.Lock:
+        # Not built in __init__: on Python 3.9 a Lock binds to the loop current at
+        # construction, and the singleton is built at import, before uvicorn's loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @asynccontextmanager
+    async def paused(self):
+        """
+        Holds back flushes while the block runs (entries keep queueing, with
+        the usual backpressure). A flush already in progress finishes first.
+        """
+        async with self._flush_lock:
+            yield
+
+    # --- Producers ---
+    async def write(self, entries: List[AuditLog]):
+        """Queues entries; waits only if the queue is full."""
+        if self._task is None:
+            # Not started (scripts, tests): write straight through
+            await self._flush([entry.model_dump(exclude={"id"}) for entry in entries])
+            return
+        for entry in entries:
+            if self._queue.full():
+                self.backpressure_waits += 1
+            await self._queue.put(entry.model_dump(exclude={"id"}))
+            self.enqueued += 1
+
+    # --- Background flushing ---
+    def _take_batch(self) -> list:
+        batch = []
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flush_loop(self):
+        stopping = False
+        while not stopping:
+            # Wait for the first entry (or, with entries held, for the next
+            # retry), then give the batch until the deadline to fill up
+            try:
+                item = await asyncio.wait_for(self._queue.get(), self.retry_interval if self._held else None)
+            except asyncio.TimeoutError:
+                await self._flush([])
+                continue
+            stopping = item is _STOP
+            batch = [] if stopping else [item]
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                if self._queue.empty():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                stopping = item is _STOP
+                if not stopping:
+                    batch.append(item)
+            await self._flush(batch)
+
+    async def _insert(self, db, batch: list):
+        """
+        insert_many with retries. insert_many stamps each dict with its _id,
+        so a duplicate-key error on a retry means that row was written by an
+        earlier attempt; only rows that really failed are sent again.
+        Returns (written, unwritten).
+        """
+        written, pending = [], batch
+        for attempt in range(3):
+            try:
+                await db["audit_logs"].insert_many(pending, ordered=False)
+                return written + pending, []
+            except BulkWriteError as e:
+                errors = {err["index"]: err for err in e.details.get("writeErrors", [])}
+                retry = []
+                for i, entry in enumerate(pending):
+                    error = errors.get(i)
+                    if error is None or error.get("code") == DUPLICATE_KEY:
+                        written.append(entry)
+                    else:
+                        retry.append(entry)
+                pending = retry
+                if not pending:
+                    return written, []
+                print(f"❌ Audit flush failed ({len(pending)} entries, attempt {attempt + 1}): {e}")
+            except Exception as e:
+                print(f"❌ Audit flush failed ({len(pending)} entries, attempt {attempt + 1}): {e}")
+            await asyncio.sleep(0.5 * (attempt + 1))
+        return written, pending
+
+    async def _flush(self, batch: list):
+        # Serialized with paused(), so a rollup rebuild never interleaves with a flush
+        async with self._flush_lock:
+            await self._write_batch(batch)
+
+    async def _write_batch(self, batch: list):
+        batch, self._held = self._held + batch, []
+        if not batch:
+            return
+        started = time.perf_counter()
+        db = await get_database()
+        written, unwritten = await self._insert(db, batch)
+        self.written += len(written)
+        if unwritten:
+            self.failed += len(unwritten)
+            self._held = unwritten
+            if len(self._held) > self.max_queue:
+                self._spill()
+        self._batch_sizes.append(len(batch))
+        self._flush_ms.append((time.perf_counter() - started) * 1e3)
+
+        # Dashboard counters, for the rows actually written; a miss here only
+        # skews counts until the next rebuild
+        if written:
+            try:
+                await update_rollups(db, written)
+            except Exception as e:
+                print(f"❌ Audit rollup update failed ({len(written)} entries): {e}")
+
+    # --- Spill file (held entries that outlive the process) ---
+    def _spill(self):
+        with open(self.spill_path, "a") as f:
+            for entry in self._held:
+                f.write(json_util.dumps(entry) + "\n")
+        print(f"💾 {len(self._held)} audit entries spilled to {self.spill_path}")
+        self.spilled += len(self._held)
+        self._held = []
+
+    def _load_spill(self) -> list:
+        if not os.path.exists(self.spill_path):
+            return []
+        with open(self.spill_path) as f:
+            entries = [json_util.loads(line) for line in f if line.strip()]
+        os.remove(self.spill_path)
+        print(f"💾 {len(entries)} spilled audit entries loaded for retry")
+        return entries
+
+    # --- Metrics ---
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "held": len(self._held),
+            "spilled": self.spilled,
+            "backpressure_waits": self.backpressure_waits,
+            "batches": len(self._batch_sizes),
+            "batch_size_mean": round(sum(self._batch_sizes) / len(self._batch_sizes), 1) if self._batch_sizes else 0.0,
+            "batch_size_max": max(self._batch_sizes, default=0),
+            **latency_summary(self._flush_ms, "flush_ms"),
+        }
+
+
+audit_writer = AuditWriter(
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    retry_interval=settings.AUDIT_RETRY_INTERVAL_SECONDS,
+    spill_path=settings.AUDIT_SPILL_PATH,
+)
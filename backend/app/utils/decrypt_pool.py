@@ -0,0 +1,79 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+from app.utils.encryption import decrypt_records
+from app.utils.executors import latency_summary
+
+# ---------------------------------------------------------
+# 🔓 PARALLEL DECRYPTION STAGE (Large record reads)
+# ---------------------------------------------------------
+# The cryptography primitives release the GIL while OpenSSL works, so a
+# big page can be split across threads. Small pages stay inline: handing
+# them to a thread costs more than it saves.
+
+class DecryptionPool:
+    def __init__(self, workers: int, threshold: int):
+        self.workers = workers
+        self.threshold = threshold
+        self._pool = None
+
+        self.inline_batches = 0
+        self.parallel_batches = 0
+        self.records = 0
+        self._timings_ms = deque(maxlen=1000)  # recent per-request decrypt times
+
+    # --- Lifecycle (called from the lifespan hook) ---
+    def start(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="decrypt")
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # --- Jobs ---
+    async def decrypt(self, records: list) -> float:
+        """
+        Decrypts records in place (same rules and fallbacks as
+        decrypt_records). Returns the time spent, in milliseconds.
+        """
+        started = time.perf_counter()
+        if self._pool is None or len(records) < self.threshold:
+            decrypt_records(records)
+            self.inline_batches += 1
+        else:
+            # Contiguous slices, each decrypted in place, so order is untouched
+            size = -(-len(records) // self.workers)
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*[
+                loop.run_in_executor(self._pool, decrypt_records, records[i:i + size])
+                for i in range(0, len(records), size)
+            ])
+            self.parallel_batches += 1
+
+        elapsed_ms = (time.perf_counter() - started) * 1e3
+        self.records += len(records)
+        self._timings_ms.append(elapsed_ms)
+        return elapsed_ms
+
+    # --- Metrics ---
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "threshold": self.threshold,
+            "running": self._pool is not None,
+            "inline_batches": self.inline_batches,
+            "parallel_batches": self.parallel_batches,
+            "records": self.records,
+            **latency_summary(self._timings_ms, "decrypt_ms"),
+        }
+
+
+decryption_pool = DecryptionPool(
+    workers=settings.DECRYPT_WORKERS,
+    threshold=settings.DECRYPT_PARALLEL_THRESHOLD,
+)
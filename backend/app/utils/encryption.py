@@ -1,5 +1,42 @@
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from bson import Binary
 import base64
+import hashlib
+import json
+import os
+
+# ---------------------------------------------------------
+# STORAGE FORMATS
+# v1: Fernet token (base64 text), one per field, key stored as hex text
+# v2: one AES-GCM blob per record, stored as BSON binary:
+#     FORMAT_V2 tag (1 byte) | nonce (12 bytes) | ciphertext + GCM tag
+#     The key is stored as 32 raw bytes.
+# ---------------------------------------------------------
+FORMAT_V2 = b"\x02"
+NONCE_SIZE = 12
+
+def to_key_id(key) -> str:
+    """Normalizes a stored quantum key (hex text or raw bytes) to its 64-char hex id."""
+    if isinstance(key, (bytes, bytearray)):
+        return bytes(key).hex()
+    return key[:64]
+
+def key_to_binary(key_hex: str) -> Binary:
+    """The v2 on-disk form of a quantum key: 32 raw bytes."""
+    return Binary(bytes.fromhex(key_hex[:64]))
+
+# Cipher contexts are built per call, not cached: every record has its own
+# quantum key, so a per-key cache is never hit on the read path and would
+# only keep old keys in memory.
+def _cipher_for_key_id(key_id: str) -> Fernet:
+    """Builds the Fernet context for a 64-char hex key id."""
+    key_bytes = bytes.fromhex(key_id)
+    return Fernet(base64.urlsafe_b64encode(key_bytes))
+
+def _aead_for_key_id(key_id: str) -> AESGCM:
+    """Builds the AES-256-GCM context for a 64-char hex key id."""
+    return AESGCM(bytes.fromhex(key_id))
 
 def get_fernet(key_hex):
     """
@@ -7,15 +44,119 @@ def get_fernet(key_hex):
     Fernet needs a 32-byte base64 encoded key.
     """
     # Take first 32 bytes of the hex key
-    key_bytes = bytes.fromhex(key_hex[:64]) 
-    return Fernet(base64.urlsafe_b64encode(key_bytes))
+    return _cipher_for_key_id(to_key_id(key_hex))
 
 def encrypt_data(data: str, key_hex: str) -> str:
-    """Locks the data using the Quantum Key"""
+    """Locks the data using the Quantum Key (v1 Fernet token)"""
     f = get_fernet(key_hex)
     return f.encrypt(data.encode()).decode()
 
-def decrypt_data(encrypted_data: str, key_hex: str) -> str:
-    """Unlocks the data using the Quantum Key"""
+def seal_data(data: str, key_hex: str) -> Binary:
+    """Locks the data using the Quantum Key (v2 AES-GCM binary blob)"""
+    nonce = os.urandom(NONCE_SIZE)
+    ciphertext = _aead_for_key_id(to_key_id(key_hex)).encrypt(nonce, data.encode(), FORMAT_V2)
+    return Binary(FORMAT_V2 + nonce + ciphertext)
+
+def decrypt_data(encrypted_data, key_hex) -> str:
+    """Unlocks the data using the Quantum Key. Reads both v1 tokens and v2 blobs."""
+    if isinstance(encrypted_data, (bytes, bytearray)):
+        blob = bytes(encrypted_data)
+        if blob[:1] != FORMAT_V2:
+            raise ValueError(f"Unknown storage format tag {blob[:1]!r}")
+        nonce, ciphertext = blob[1:1 + NONCE_SIZE], blob[1 + NONCE_SIZE:]
+        return _aead_for_key_id(to_key_id(key_hex)).decrypt(nonce, ciphertext, FORMAT_V2).decode()
+
     f = get_fernet(key_hex)
-    return f.decrypt(encrypted_data.encode()).decode()
\ No newline at end of file
+    return f.decrypt(encrypted_data.encode()).decode()
+
+def encrypt_many(items):
+    """Locks a list of (data, key_hex) pairs. Returns tokens in the same order."""
+    return [get_fernet(key).encrypt(data.encode()).decode() for data, key in items]
+
+def decrypt_many(items):
+    """Unlocks a list of (encrypted_data, key_hex) pairs, in order. Raises on the first failure."""
+    return [decrypt_data(token, key) for token, key in items]
+
+def decrypt_many_checked(items):
+    """
+    Like decrypt_many, but never raises. Returns (results, ok): an item that
+    fails to decrypt comes back unchanged in results with ok[i] False.
+    """
+    results, ok = [], []
+    for token, key in items:
+        try:
+            results.append(decrypt_data(token, key))
+            ok.append(True)
+        except Exception as e:
+            print(f"Decryption Error: {e}")
+            results.append(token)
+            ok.append(False)
+    return results, ok
+
+# ---------------------------------------------------------
+# RECORD-LEVEL HELPERS (diagnosis + prescription)
+# ---------------------------------------------------------
+SEALED_FIELDS = ("diagnosis", "prescription")
+
+def seal_record_fields(fields: dict, key_hex: str) -> Binary:
+    """Packs diagnosis and prescription into one authenticated v2 blob."""
+    return seal_data(json.dumps({name: fields[name] for name in SEALED_FIELDS}, separators=(",", ":")), key_hex)
+
+def content_signature(patient_id, diagnosis: str) -> str:
+    """
+    Duplicate-transfer fingerprint of a record's plaintext. Stored on the
+    record at write time (data_signature) so transfers never decrypt to
+    compute it.
+    """
+    return hashlib.sha256(f"{patient_id}-{diagnosis}".encode()).hexdigest()
+
+# Set on a record dict by decrypt_records when its fields could not be opened
+# (and stored on accepted transfers whose packet could not be opened)
+DECRYPT_FAILED = "decryption_failed"
+# Diagnosis stored on such an accepted transfer, for manual review
+DECRYPT_ERROR_DIAGNOSIS = "Decryption Error - Manual Review Needed"
+
+def undecryptable(record: dict) -> bool:
+    """
+    True for a record whose plaintext must never be signed or re-sent:
+    flagged, or an accepted transfer from before the flag existed (the
+    marker text was stored as the diagnosis).
+    """
+    return bool(record.get(DECRYPT_FAILED)) or record.get("diagnosis") == DECRYPT_ERROR_DIAGNOSIS
+
+def decrypt_records(records):
+    """
+    Decrypts diagnosis/prescription in place for a list of record documents,
+    v1 or v2, with one decrypt_many_checked call. Records without a key are
+    untouched. A record that fails gets DECRYPT_FAILED set to True; for
+    display, a v1 field that fails stays as stored and a failed v2 blob
+    yields an error marker. Code that reuses the plaintext must check the flag.
+    """
+    encrypted = [rec for rec in records if rec.get("quantum_key")]
+    pairs = []
+    for rec in encrypted:
+        if rec.get("storage_format") == 2:
+            pairs.append((rec["sealed_fields"], rec["quantum_key"]))
+        else:
+            # A missing field fails to decrypt (and flags the record) instead of raising
+            pairs.extend((rec.get(name), rec["quantum_key"]) for name in SEALED_FIELDS)
+    results, ok = decrypt_many_checked(pairs)
+    plain = iter(zip(results, ok))
+
+    for rec in encrypted:
+        if rec.get("storage_format") == 2:
+            opened, opened_ok = next(plain)
+            del rec["sealed_fields"]
+            # A failed blob comes back as the raw bytes, which can't be served
+            if opened_ok:
+                rec.update(json.loads(opened))
+            else:
+                rec.update(dict.fromkeys(SEALED_FIELDS, "Decryption Error"))
+                rec[DECRYPT_FAILED] = True
+            rec["quantum_key"] = to_key_id(rec["quantum_key"])
+        else:
+            for name in SEALED_FIELDS:
+                rec[name], field_ok = next(plain)
+                if not field_ok:
+                    rec[DECRYPT_FAILED] = True
+    return records
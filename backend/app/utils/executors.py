@@ -0,0 +1,81 @@
+import asyncio
+import time
+from collections import deque
+
+# ---------------------------------------------------------
+# 🧵 SHARED POOL PLUMBING (Admission limit + latency percentiles)
+# ---------------------------------------------------------
+
+def percentile(ordered, p: float, digits: int = 2) -> float:
+    """The p-quantile (0..1) of an already sorted sequence; 0.0 when empty."""
+    if not ordered:
+        return 0.0
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], digits)
+
+def latency_summary(samples, prefix: str, digits: int = 2) -> dict:
+    """p50 / p95 / max of recent timing samples, keyed '<prefix>_p50' etc."""
+    ordered = sorted(samples)
+    return {
+        f"{prefix}_p50": percentile(ordered, 0.50, digits),
+        f"{prefix}_p95": percentile(ordered, 0.95, digits),
+        f"{prefix}_max": round(ordered[-1], digits) if ordered else 0.0,
+    }
+
+
+class BoundedExecutor:
+    """
+    A concurrent.futures pool (created by the subclass's start()) behind a
+    queue-depth limit. Jobs over the limit raise `busy_error` straight away
+    instead of queueing. Before start() (e.g. in scripts) jobs run inline;
+    once started, jobs never run inline: while the pool is missing
+    (restarting, stopping) they raise `busy_error` too.
+    """
+    busy_error = RuntimeError
+    job_name = "jobs"
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pool = None
+        self._started = False   # set by the subclass's start()
+
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._latencies_ms = deque(maxlen=1000)  # recent job latencies, queueing included
+
+    def _shutdown_pool(self, wait: bool = False):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    async def run(self, fn, *args):
+        if self._pool is None:
+            if self._started:
+                self.rejected += 1
+                raise self.busy_error(f"{self.job_name} pool unavailable (restarting or stopped)")
+            return fn(*args)
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise self.busy_error(f"{self.pending} {self.job_name} already pending")
+
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self._latencies_ms.append((time.perf_counter() - started) * 1e3)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self._pool is not None,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            **latency_summary(self._latencies_ms, "latency_ms", digits=1),
+        }
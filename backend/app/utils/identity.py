@@ -0,0 +1,61 @@
+from typing import Optional
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+# ---------------------------------------------------------
+# 🪪 IDENTITY RESOLVER (Patient lookup by ABHA or email)
+# ---------------------------------------------------------
+
+# Only the fields the write paths need
+IDENTITY_PROJECTION = {"_id": 1, "email": 1, "abha_number": 1}
+
+def clean_abha(abha: str) -> str:
+    # Clean the input (remove dashes)
+    return abha.replace("-", "").replace(" ", "")
+
+class IdentityResolver:
+    """
+    Resolves a patient by ABHA number or email, with a short-TTL cache in
+    front of the users collection. Email and ABHA number are fixed at
+    registration; profile updates call forget() so the next lookup re-reads
+    the user, and the TTL bounds anything else (e.g. deletions). Misses are
+    not cached, so a patient who registers a moment later is found straight
+    away.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def resolve(self, db, abha: Optional[str] = None, email: Optional[str] = None) -> Optional[dict]:
+        if abha:
+            abha = clean_abha(abha)
+            key, query = ("abha", abha), {"abha_number": abha}
+        elif email:
+            key, query = ("email", email), {"email": email}
+        else:
+            return None
+
+        identity = self.cache.get(key)
+        if identity is None:
+            identity = await db["users"].find_one(query, IDENTITY_PROJECTION)
+            if identity is None:
+                return None
+            self.remember(identity)
+        return identity
+
+    def remember(self, identity: dict):
+        self.cache.set(("email", identity["email"]), identity)
+        if identity.get("abha_number"):
+            self.cache.set(("abha", identity["abha_number"]), identity)
+
+    def forget(self, identity: dict):
+        self.cache.invalidate(("email", identity.get("email")))
+        self.cache.invalidate(("abha", identity.get("abha_number")))
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+identity_resolver = IdentityResolver(
+    maxsize=settings.IDENTITY_CACHE_SIZE,
+    ttl=settings.IDENTITY_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,94 @@
+import asyncio
+from collections import defaultdict
+
+from app.core.config import settings
+from app.db.indexes import TRANSFER_INBOX
+
+# ---------------------------------------------------------
+# 📣 INBOX EVENTS (In-process pub/sub per hospital inbox)
+# ---------------------------------------------------------
+# Events are hints ("new transfers arrived"), not the data itself: a
+# client that receives one refetches /my-inbox. So a subscriber that falls
+# behind loses nothing by having extra events dropped.
+
+class InboxBroker:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)   # inbox partition -> {asyncio.Queue}
+        self._task = None
+
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    # --- Subscribers (one per open stream) ---
+    def subscribe(self, partition: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[partition].add(queue)
+        return queue
+
+    def unsubscribe(self, partition: str, queue: asyncio.Queue):
+        self._subscribers[partition].discard(queue)
+        if not self._subscribers[partition]:
+            del self._subscribers[partition]
+
+    # --- Publishers (execute-batch, or the change stream) ---
+    def publish(self, partition: str, event: dict):
+        self.published += 1
+        for queue in self._subscribers.get(partition, ()):
+            try:
+                queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    # --- Optional source: MongoDB change stream (replica set only) ---
+    # Sees inserts from every uvicorn worker, not just this process.
+    async def start(self, db):
+        if settings.INBOX_CHANGE_STREAM and self._task is None:
+            self._task = asyncio.create_task(self._watch(db))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self, db):
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        while True:
+            try:
+                async with db[TRANSFER_INBOX].watch(pipeline) as stream:
+                    print("📣 Inbox change stream started")
+                    async for change in stream:
+                        packet = change["fullDocument"]
+                        self.publish(packet["target_hospital"], {
+                            "count": 1,
+                            "sender": packet.get("sender_hospital"),
+                        })
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Inbox change stream error (retrying): {e}")
+                await asyncio.sleep(5)
+
+    @property
+    def uses_change_stream(self) -> bool:
+        return self._task is not None
+
+    # --- Metrics ---
+    def stats(self) -> dict:
+        return {
+            "source": "change_stream" if self.uses_change_stream else "in_process",
+            "inboxes": len(self._subscribers),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+inbox_broker = InboxBroker(queue_size=settings.INBOX_STREAM_QUEUE_SIZE)
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from collections import deque
+
+from app.core.config import settings
+from app.utils.qkd_executor import qkd_executor, QKDExecutorBusy
+
+# ---------------------------------------------------------
+# 🔑 QKD KEY POOL (Pre-generated keys, refilled in background)
+# ---------------------------------------------------------
+
+REFILL_BACKOFF_MAX_SECONDS = 5.0
+
+class QKDKeyPool:
+    """
+    Bounded pool of fresh QKD keys.
+    Every key is popped exactly once, so no key is ever handed out twice.
+    When the pool is empty, callers fall back to the QKD executor.
+    """
+    def __init__(self, capacity: int, refill_batch: int):
+        self.capacity = capacity
+        self.refill_batch = refill_batch
+        self._keys = deque()
+        self._wanted = None   # asyncio.Event, created on the running loop in start()
+        self._task = None
+
+        self.hits = 0
+        self.misses = 0
+        self.keys_generated = 0
+        self.refill_seconds = 0.0
+        self.refill_errors = 0
+        self.last_refill_error = None
+
+    # --- Lifecycle (called from the lifespan hook) ---
+    async def start(self):
+        if self._task is None:
+            self._wanted = asyncio.Event()
+            self._task = asyncio.create_task(self._refill_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._keys.clear()
+
+    # --- Handing out keys ---
+    async def take(self) -> str:
+        """Returns one unused key in O(1), or generates one if empty.
+           Raises QKDExecutorBusy if generation is needed but the executor is full.
+        """
+        if self._keys:
+            self.hits += 1
+            key = self._keys.popleft()
+            self._request_refill()
+            return key
+
+        self.misses += 1
+        self._request_refill()
+        return await qkd_executor.generate_key()
+
+    async def take_many(self, n: int) -> list:
+        """Returns n unused keys; any shortfall is generated in one batch."""
+        from_pool = min(n, len(self._keys))
+        keys = [self._keys.popleft() for _ in range(from_pool)]
+        self.hits += from_pool
+
+        shortfall = n - from_pool
+        if shortfall > 0:
+            self.misses += shortfall
+            keys.extend(await qkd_executor.generate_keys(shortfall))
+        self._request_refill()
+        return keys
+
+    # --- Background refill ---
+    def _request_refill(self):
+        if self._wanted is not None and len(self._keys) < self.capacity:
+            self._wanted.set()
+
+    async def _refill_loop(self):
+        failures = 0
+        while True:
+            missing = self.capacity - len(self._keys)
+            if missing <= 0:
+                self._wanted.clear()
+                await self._wanted.wait()
+                continue
+
+            started = time.perf_counter()
+            try:
+                keys = await qkd_executor.generate_keys(min(missing, self.refill_batch))
+            except QKDExecutorBusy:
+                # Request handlers get priority; try again shortly
+                await asyncio.sleep(0.05)
+                continue
+            except Exception as e:
+                # e.g. BrokenProcessPool: the executor replaces its workers; keep
+                # refilling with a growing pause instead of dying silently
+                self.refill_errors += 1
+                self.last_refill_error = repr(e)
+                failures += 1
+                delay = min(REFILL_BACKOFF_MAX_SECONDS, 0.1 * 2 ** failures)
+                print(f"❌ Key pool refill failed ({e!r}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            self.refill_seconds += time.perf_counter() - started
+
+            self._keys.extend(keys)
+            self.keys_generated += len(keys)
+
+    # --- Metrics ---
+    def stats(self) -> dict:
+        served = self.hits + self.misses
+        return {
+            "size": len(self._keys),
+            "capacity": self.capacity,
+            "fill_ratio": round(len(self._keys) / self.capacity, 3) if self.capacity else 0.0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / served, 3) if served else 0.0,
+            "keys_generated": self.keys_generated,
+            "refill_keys_per_sec": round(self.keys_generated / self.refill_seconds, 1) if self.refill_seconds else 0.0,
+            "running": self._task is not None and not self._task.done(),
+            "refill_errors": self.refill_errors,
+            "last_refill_error": self.last_refill_error,
+        }
+
+
+key_pool = QKDKeyPool(
+    capacity=settings.QKD_KEY_POOL_SIZE,
+    refill_batch=settings.QKD_KEY_POOL_REFILL_BATCH,
+)
@@ -0,0 +1,31 @@
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+# ---------------------------------------------------------
+# 📑 KEYSET PAGINATION (Newest first, on (<time field>, _id))
+# ---------------------------------------------------------
+# The cursor is opaque to clients: base64 of the last row's time and _id.
+
+def encode_cursor(doc: dict, field: str) -> str:
+    raw = json.dumps({"c": doc[field].isoformat(), "i": str(doc["_id"])})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str, field: str) -> dict:
+    """
+    Turns a cursor into the filter for 'rows older than this one'. The
+    top-level $lte bounds the (..., field, _id) index scan; the $or only
+    drops the rows of the cursor's own instant that were already served.
+    """
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        when, last_id = datetime.fromisoformat(raw["c"]), ObjectId(raw["i"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {
+        field: {"$lte": when},
+        "$or": [{field: {"$lt": when}}, {"_id": {"$lt": last_id}}],
+    }
@@ -0,0 +1,186 @@
+import asyncio
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.utils.qkd_executor import QKDExecutor
+from app.utils.quantum import run_qkd_trials
+
+# ---------------------------------------------------------
+# 📈 QKD LINK ANALYTICS (Monte Carlo over a background process pool)
+# ---------------------------------------------------------
+# Each (qubits, noise, eavesdrop) point runs `trials` full BB84 pipelines.
+# Trials are split into fixed-size chunks and run on a separate, low-priority
+# pool, so studies never queue behind (or in front of) key generation; the
+# parent only merges arrays and takes percentiles.
+
+class QKDAnalyticsBusy(Exception):
+    """Raised when running studies already use the global qubit-trial budget."""
+
+PERCENTILES = (5, 25, 50, 75, 95)
+METRICS = ("sifted_key_rate", "qber", "secret_key_rate")
+
+def summarize(values: np.ndarray) -> dict:
+    summary = {f"p{p}": round(float(v), 5) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+    summary["mean"] = round(float(values.mean()), 5)
+    summary["std"] = round(float(values.std()), 5)
+    return summary
+
+class QKDAnalytics:
+    """
+    Runs and caches Monte Carlo link studies. Results are cached by the
+    normalized parameter set, and identical requests arriving while a study
+    is running wait for that study instead of starting their own.
+    """
+    def __init__(self, executor, maxsize: int, ttl: float, chunk_trials: int, max_inflight: int):
+        self.executor = executor
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.chunk_trials = chunk_trials
+        self.max_inflight = max_inflight     # qubit-trials across running studies
+        self._inflight = {}   # params -> asyncio.Task
+        self._slots = None    # one per worker, shared by all studies
+
+        self.studies = 0
+        self.trials_run = 0
+        self.shared = 0
+        self.rejected = 0
+        self.reserved = 0     # qubit-trials of the running studies
+
+    # --- Lifecycle (called from the lifespan hook) ---
+    async def start(self):
+        await self.executor.start()
+
+    async def stop(self):
+        await self.executor.stop()
+
+    @property
+    def parallelism(self) -> int:
+        """Chunks in flight at once: one per worker, within the pool's queue limit."""
+        return max(1, min(self.executor.workers, self.executor.max_pending))
+
+    @staticmethod
+    def params_key(qubits, noise, eavesdrop, trials) -> tuple:
+        return (
+            tuple(sorted(set(qubits))),
+            tuple(sorted(set(round(n, 4) for n in noise))),
+            tuple(sorted(set(round(e, 4) for e in eavesdrop))),
+            trials,
+        )
+
+    @staticmethod
+    def cost(key) -> int:
+        """Simulated qubits of a study: trials x qubits, summed over its points."""
+        qubits, noise, eavesdrop, trials = key
+        return trials * sum(qubits) * len(noise) * len(eavesdrop)
+
+    async def study(self, qubits, noise, eavesdrop, trials) -> dict:
+        key = self.params_key(qubits, noise, eavesdrop, trials)
+        result = self.cache.get(key)
+        if result is not None:
+            return {**result, "cached": True}
+
+        task = self._inflight.get(key)
+        if task is None:
+            cost = self.cost(key)
+            if self.reserved + cost > self.max_inflight:
+                self.rejected += 1
+                raise QKDAnalyticsBusy(f"{self.reserved} qubit-trials already running")
+            self.reserved += cost
+            task = asyncio.create_task(self._run(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, cost, t))
+        else:
+            self.shared += 1
+        # shield: one client disconnecting must not cancel a study others wait on
+        result = await asyncio.shield(task)
+        return {**result, "cached": False}
+
+    async def _run(self, key) -> dict:
+        qubits, noise, eavesdrop, trials = key
+        points = [(q, n, e) for q in qubits for n in noise for e in eavesdrop]
+        started = time.perf_counter()
+
+        # Small fixed-size chunks, at most one per worker in flight across all
+        # studies: the pool's queue stays short and a failure wastes little
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.parallelism)
+        sizes = [min(self.chunk_trials, trials - i) for i in range(0, trials, self.chunk_trials)]
+        chunks = [(i, point, n) for i, point in enumerate(points) for n in sizes]
+        chunks.reverse()   # pop() from the end, first point first
+        outputs = [[] for _ in points]
+
+        async def runner():
+            while True:
+                async with self._slots:
+                    if not chunks:
+                        return
+                    i, point, n = chunks.pop()
+                    outputs[i].append(await self.executor.run(run_qkd_trials, *point, n))
+
+        runners = [asyncio.ensure_future(runner()) for _ in range(self.parallelism)]
+        try:
+            await asyncio.gather(*runners)
+        except BaseException:
+            # One chunk failed (or the study was cancelled): stop its siblings
+            for r in runners:
+                r.cancel()
+            await asyncio.gather(*runners, return_exceptions=True)
+            raise
+
+        results = []
+        for (q, n, e), parts in zip(points, outputs):
+            merged = {m: np.concatenate([part[m] for part in parts]) for m in METRICS}
+            results.append({
+                "qubits": q,
+                "noise": n,
+                "eavesdrop": e,
+                "trials": trials,
+                "abort_rate": round(float(np.mean(merged["secret_key_rate"] == 0)), 5),
+                **{m: summarize(merged[m]) for m in METRICS},
+            })
+
+        self.studies += 1
+        self.trials_run += trials * len(points)
+        result = {
+            "points": len(points),
+            "trials_per_point": trials,
+            "elapsed_ms": round((time.perf_counter() - started) * 1e3, 1),
+            "results": results,
+        }
+        self.cache.set(key, result)
+        return result
+
+    def _finished(self, key, cost: int, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        self.reserved -= cost
+        if not task.cancelled():
+            task.exception()   # waiters may all be gone; don't warn "never retrieved"
+
+    # --- Metrics ---
+    def stats(self) -> dict:
+        return {
+            "studies": self.studies,
+            "trials_run": self.trials_run,
+            "inflight": len(self._inflight),
+            "shared_inflight": self.shared,
+            "rejected": self.rejected,
+            "reserved_qubit_trials": self.reserved,
+            "max_inflight_qubit_trials": self.max_inflight,
+            "cache": self.cache.stats(),
+            "executor": self.executor.stats(),
+        }
+
+
+qkd_analytics = QKDAnalytics(
+    QKDExecutor(
+        workers=settings.QKD_ANALYTICS_WORKERS,
+        max_pending=settings.QKD_ANALYTICS_MAX_PENDING,
+        nice=settings.QKD_ANALYTICS_NICE,
+    ),
+    maxsize=settings.QKD_ANALYTICS_CACHE_SIZE,
+    ttl=settings.QKD_ANALYTICS_CACHE_TTL_SECONDS,
+    chunk_trials=settings.QKD_ANALYTICS_CHUNK_TRIALS,
+    max_inflight=settings.QKD_ANALYTICS_MAX_QUBIT_TRIALS_INFLIGHT,
+)
@@ -0,0 +1,114 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.config import settings
+from app.utils.executors import BoundedExecutor
+from app.utils.quantum import simulate_qkd_exchange, simulate_qkd_exchange_batch
+
+# ---------------------------------------------------------
+# ⚙️ QKD EXECUTOR (BB84 simulation off the event loop)
+# ---------------------------------------------------------
+# The simulation is pure CPU work. Running it in worker processes keeps
+# the uvicorn event loop free for logins, inbox polls, etc.
+
+class QKDExecutorBusy(Exception):
+    """Raised when more QKD jobs are pending than the configured limit."""
+
+def _lower_priority(increment: int):
+    # Runs once in each worker process: the OS schedules it behind the API
+    if hasattr(os, "nice"):
+        os.nice(increment)
+
+
+class QKDExecutor(BoundedExecutor):
+    """
+    Process pool for QKD key generation with a queue-depth limit.
+    Before start() (e.g. in scripts) jobs simply run inline. `nice` > 0
+    lowers the workers' CPU priority (background work such as analytics).
+    """
+    busy_error = QKDExecutorBusy
+    job_name = "QKD jobs"
+
+    def __init__(self, workers: int, max_pending: int, nice: int = 0):
+        super().__init__(workers, max_pending)
+        self.nice = nice
+        self._restarting = False
+        self._stopping = False
+        self.restarts = 0
+
+    # --- Lifecycle (called from the lifespan hook) ---
+    async def start(self):
+        if self._pool is not None:
+            return
+        self._started = True
+        self._stopping = False
+        # 'spawn' avoids forking a process that already runs Motor's threads
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_lower_priority if self.nice else None,
+            initargs=(self.nice,) if self.nice else (),
+        )
+        # Warm up the workers so the first request doesn't pay the spawn cost
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self._pool, simulate_qkd_exchange, 8)
+            for _ in range(self.workers)
+        ])
+
+    async def stop(self):
+        self._stopping = True
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+    # --- Jobs ---
+    async def run(self, fn, *args):
+        if self._started and self._pool is None and not (self._restarting or self._stopping):
+            print("🔁 Retrying the QKD worker pool restart")
+            await self._restart()   # an earlier restart failed
+        pool = self._pool
+        try:
+            # Rejected (QKDExecutorBusy) while no pool exists, never run inline
+            return await super().run(fn, *args)
+        except BrokenProcessPool:
+            if pool is not None and self._pool is pool:
+                print("❌ QKD worker pool broken; starting a new one")
+                await self._restart()
+            raise
+
+    async def _restart(self):
+        # A worker died (OOM kill, crash) and the pool refuses all work from
+        # now on: replace it once, so later jobs succeed again
+        self._restarting = True
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        try:
+            await self.start()
+            self.restarts += 1
+        except Exception as e:
+            self._shutdown_pool()
+            print(f"❌ QKD worker pool restart failed: {e}")
+        finally:
+            self._restarting = False
+
+    def stats(self) -> dict:
+        return {**super().stats(), "restarts": self.restarts}
+
+    async def generate_key(self) -> str:
+        result = await self.run(simulate_qkd_exchange)
+        return result["final_key"]
+
+    async def generate_keys(self, n: int) -> list:
+        result = await self.run(simulate_qkd_exchange_batch, n)
+        return result["keys"]
+
+
+qkd_executor = QKDExecutor(
+    workers=settings.QKD_EXECUTOR_WORKERS,
+    max_pending=settings.QKD_EXECUTOR_MAX_PENDING,
+)
@@ -1,73 +1,371 @@
-import random
+import os
+import time
 import hashlib
+import numpy as np
 
 # ---------------------------------------------------------
 # ⚛️ QUANTUM SIMULATION ENGINE (BB84 Protocol)
 # ---------------------------------------------------------
+# Bits and bases are kept as packed uint8 arrays (8 qubits per byte),
+# so measurement is a handful of bitwise ops over the whole stream
+# instead of one Python call per qubit.
+
+def _random_packed(n_bits, sessions=None):
+    """Cryptographically random bits, packed 8 per byte (MSB first).
+       With `sessions`, returns one packed row per session.
+    """
+    n_bytes = (n_bits + 7) // 8
+    if sessions is None:
+        return np.frombuffer(os.urandom(n_bytes), dtype=np.uint8)
+    return np.frombuffer(os.urandom(sessions * n_bytes), dtype=np.uint8).reshape(sessions, n_bytes)
 
 def generate_random_bits(length):
-    """Step 1: Alice generates random bits (0s and 1s)."""
-    return [random.randint(0, 1) for _ in range(length)]
+    """Step 1: Alice generates random bits (0s and 1s), packed."""
+    return _random_packed(length)
 
 def generate_bases(length):
-    """Step 2: Alice chooses random bases to encode qubits.
+    """Step 2: Alice chooses random bases to encode qubits, packed.
        0 = Rectilinear Base (+) | 1 = Diagonal Base (x)
     """
-    return [random.randint(0, 1) for _ in range(length)]
+    return _random_packed(length)
 
 def measure_qubits(alice_bits, alice_bases, bob_bases):
     """Step 3: Bob measures the qubits.
        If Bob chooses the SAME base as Alice, he gets the correct bit.
-       If he chooses the WRONG base, he has a 50% chance of error.
-    """
-    bob_results = []
-    for i in range(len(alice_bits)):
-        if alice_bases[i] == bob_bases[i]:
-            # Bases match -> Perfect transmission
-            bob_results.append(alice_bits[i])
-        else:
-            # Bases don't match -> Quantum randomness (50% noise)
-            bob_results.append(random.randint(0, 1))
-    return bob_results
-
-def sift_keys(alice_bases, bob_bases, bob_results):
+       If he chooses the WRONG base, he gets a random bit (50% noise).
+    """
+    match = ~(alice_bases ^ bob_bases)
+    noise = np.frombuffer(os.urandom(alice_bits.size), dtype=np.uint8).reshape(alice_bits.shape)
+    return (alice_bits & match) | (noise & ~match)
+
+def sift_keys(alice_bases, bob_bases, bob_results, length):
     """Step 4: Sifting.
        Alice and Bob publicly compare bases (not bits!).
        They keep bits only where their bases MATCHED.
+       Returns the sifted key (packed) and its length in bits.
     """
-    sifted_key = []
-    for i in range(len(alice_bases)):
-        if alice_bases[i] == bob_bases[i]:
-            sifted_key.append(bob_results[i])
-    return sifted_key
+    match = np.unpackbits(~(alice_bases ^ bob_bases), count=length).view(bool)
+    sifted = np.compress(match, np.unpackbits(bob_results, count=length))
+    return np.packbits(sifted), int(sifted.size)
 
-def simulate_qkd_exchange(key_length=128):
+def run_bb84_session(n_qubits):
     """
-    Runs a full simulation of Alice and Bob creating a secret key.
-    Returns: A 256-bit Hash of the shared key (for AES encryption).
+    Runs one BB84 session over n_qubits.
+    Returns: (packed sifted key, number of sifted bits)
     """
-    # 1. Setup
-    n_qubits = key_length * 4  # We need extra qubits because many get discarded
-    
-    # 2. Alice prepares qubits
     alice_bits = generate_random_bits(n_qubits)
     alice_bases = generate_bases(n_qubits)
-    
-    # 3. Bob measures qubits (randomly choosing bases)
     bob_bases = generate_bases(n_qubits)
     bob_results = measure_qubits(alice_bits, alice_bases, bob_bases)
-    
-    # 4. Sifting (Discarding bad measurements)
-    shared_key_bits = sift_keys(alice_bases, bob_bases, bob_results)
-    
-    # 5. Convert bits to a string
-    shared_key_str = "".join(map(str, shared_key_bits))
-    
-    # 6. Final Polish: Hash it to make a strong password for AES
-    final_key = hashlib.sha256(shared_key_str.encode()).hexdigest()
-    
+    return sift_keys(alice_bases, bob_bases, bob_results, n_qubits)
+
+def run_bb84_sessions(n_sessions, n_qubits):
+    """
+    Runs n_sessions independent BB84 sessions as one matrix operation.
+    Returns: (packed sifted keys, one row per session, zero-padded;
+              number of sifted bits per session)
+    """
+    alice_bits = _random_packed(n_qubits, n_sessions)
+    alice_bases = _random_packed(n_qubits, n_sessions)
+    bob_bases = _random_packed(n_qubits, n_sessions)
+    bob_results = measure_qubits(alice_bits, alice_bases, bob_bases)
+
+    match = np.unpackbits(~(alice_bases ^ bob_bases), axis=1, count=n_qubits).view(bool)
+    results = np.unpackbits(bob_results, axis=1, count=n_qubits)
+
+    # Sifting: the kept bits of every row, concatenated, are written back
+    # into the front of each row (row-major order keeps them in sequence)
+    counts = np.count_nonzero(match, axis=1)
+    kept = np.compress(match.ravel(), results.ravel())
+    sifted = np.zeros_like(results)
+    np.place(sifted, np.arange(n_qubits) < counts[:, None], kept)
+    return np.packbits(sifted, axis=1), counts
+
+def simulate_qkd_exchange(key_length=128):
+    """
+    Runs a full simulation of Alice and Bob creating a secret key.
+    Returns: A 256-bit Hash of the shared key (for AES encryption).
+    """
+    # We need extra qubits because many get discarded during sifting
+    n_qubits = key_length * 4
+
+    shared_key, sifted_count = run_bb84_session(n_qubits)
+
+    # Final Polish: Hash the packed key to make a strong password for AES
+    final_key = hashlib.sha256(shared_key.tobytes()).hexdigest()
+
     return {
         "success": True,
-        "raw_bits_count": len(shared_key_bits),
+        "raw_bits_count": sifted_count,
         "final_key": final_key
-    }
\ No newline at end of file
+    }
+
+def simulate_qkd_exchange_batch(n, key_length=128):
+    """
+    Runs n independent key exchanges in one vectorized pass.
+    Returns: n 256-bit keys (same form as simulate_qkd_exchange)
+             plus sifted-bit statistics for the batch.
+    """
+    n_qubits = key_length * 4
+    packed, counts = run_bb84_sessions(max(n, 0), n_qubits)
+
+    # Hash only each row's own sifted bytes, exactly like a single session
+    keys = [
+        hashlib.sha256(row[:(int(c) + 7) // 8].tobytes()).hexdigest()
+        for row, c in zip(packed, counts)
+    ]
+
+    return {
+        "success": True,
+        "keys": keys,
+        "sifted_bits_counts": counts.tolist(),
+        "stats": {
+            "sessions": len(keys),
+            "qubits_per_session": n_qubits,
+            "sifted_bits_min": int(counts.min()) if keys else 0,
+            "sifted_bits_max": int(counts.max()) if keys else 0,
+            "sifted_bits_mean": float(counts.mean()) if keys else 0.0,
+        }
+    }
+
+# ---------------------------------------------------------
+# 📡 NOISY CHANNEL + POST-PROCESSING (QBER, Cascade, Toeplitz)
+# ---------------------------------------------------------
+# The functions above assume a perfect channel. The pipeline below adds
+# channel noise and an intercept-resend eavesdropper, estimates the QBER
+# on a public sample, reconciles errors with Cascade and shrinks the key
+# with Toeplitz hashing. Everything works on whole NumPy arrays; the only
+# Python loops are over Cascade passes and binary-search depth.
+
+def _rng():
+    # Simulation randomness (noise, sampling, permutations), seeded from the OS
+    return np.random.default_rng(int.from_bytes(os.urandom(16), "big"))
+
+def _bernoulli_packed(p, n_bits, rng):
+    """Packed mask with each bit set independently with probability p."""
+    if p <= 0:
+        return np.zeros((n_bits + 7) // 8, dtype=np.uint8)
+    return np.packbits(rng.random(n_bits) < p)
+
+def transmit(alice_bits, alice_bases, bob_bases, n_qubits, noise=0.0, eavesdrop=0.0, rng=None):
+    """
+    Step 3 over a real channel. A fraction `eavesdrop` of the qubits is
+    intercepted by Eve, measured in a random basis and resent in that
+    basis (intercept-resend); then each qubit flips with probability
+    `noise` on its way to Bob. Returns Bob's packed results.
+    """
+    rng = rng or _rng()
+    state_bits, state_bases = alice_bits, alice_bases
+    if eavesdrop > 0:
+        intercepted = _bernoulli_packed(eavesdrop, n_qubits, rng)
+        eve_bases = generate_bases(n_qubits)
+        eve_bits = measure_qubits(alice_bits, alice_bases, eve_bases)
+        state_bits = (eve_bits & intercepted) | (alice_bits & ~intercepted)
+        state_bases = (eve_bases & intercepted) | (alice_bases & ~intercepted)
+    bob_results = measure_qubits(state_bits, state_bases, bob_bases)
+    return bob_results ^ _bernoulli_packed(noise, n_qubits, rng)
+
+def sift_both(alice_bits, alice_bases, bob_bases, bob_results, length):
+    """Step 4 for both sides: Alice's and Bob's sifted bits (unpacked, 0/1)."""
+    match = np.unpackbits(~(alice_bases ^ bob_bases), count=length).view(bool)
+    alice = np.compress(match, np.unpackbits(alice_bits, count=length))
+    bob = np.compress(match, np.unpackbits(bob_results, count=length))
+    return alice, bob
+
+def estimate_qber(alice, bob, sample_fraction, rng=None):
+    """
+    Step 5: Alice and Bob publicly compare a random sample of sifted bits
+    and throw it away. Returns (qber, remaining alice bits, remaining bob
+    bits, sample size).
+    """
+    rng = rng or _rng()
+    sample = rng.random(alice.size) < sample_fraction
+    n_sample = int(np.count_nonzero(sample))
+    errors = np.count_nonzero(alice[sample] != bob[sample])
+    qber = errors / n_sample if n_sample else 0.0
+    keep = ~sample
+    return qber, alice[keep], bob[keep], n_sample
+
+def _cascade_pass(alice, bob, order, block, blocks_known=False):
+    """
+    One Cascade pass: compare block parities (in `order`), and for every
+    odd block binary-search the error, all blocks at once. Bob's bits are
+    corrected in place. Returns (errors corrected, parities disclosed).
+    Alice's bits never change, so once a layout's block parities are
+    public (`blocks_known`) comparing them again discloses nothing.
+    """
+    n = alice.size
+    diff = (alice ^ bob)[order]
+    # prefix[i] = parity of diff[:i]; parity of [lo, hi) = prefix[hi] ^ prefix[lo]
+    prefix = np.concatenate(([0], np.bitwise_xor.accumulate(diff))).astype(np.uint8)
+
+    starts = np.arange(0, n, block)
+    ends = np.minimum(starts + block, n)
+    odd = (prefix[ends] ^ prefix[starts]).astype(bool)
+    disclosed = 0 if blocks_known else starts.size
+
+    lo, hi = starts[odd], ends[odd]
+    while True:
+        active = hi - lo > 1
+        if not active.any():
+            break
+        mid = (lo + hi) // 2
+        left_odd = (prefix[mid] ^ prefix[lo]).astype(bool)
+        disclosed += int(np.count_nonzero(active))
+        hi = np.where(active & left_odd, mid, hi)
+        lo = np.where(active & ~left_odd, mid, lo)
+
+    bob[order[lo]] ^= 1
+    return int(lo.size), disclosed
+
+def cascade_correct(alice, bob, qber, passes=4, max_sweeps=8, rng=None):
+    """
+    Step 6: Cascade-style error reconciliation. Pass 1 uses blocks of about
+    0.73 / QBER bits in natural order; each later pass doubles the block
+    size over a fresh random permutation. Correcting a bit can unmask an
+    error in an earlier pass's block, so passes are swept again until a
+    full sweep finds nothing. Block parities count as disclosed once (the
+    first sweep); only the binary searches of later sweeps leak more.
+    `qber` only sizes the blocks, so callers may pass a pessimistic bound.
+    Returns (corrected bob bits, errors corrected, parities disclosed).
+    """
+    rng = rng or _rng()
+    bob = bob.copy()
+    n = alice.size
+    if n == 0:
+        return bob, 0, 0
+
+    first_block = int(max(4, min(n, 0.73 / qber if qber > 0 else n)))
+    layout = [(np.arange(n), first_block)]
+    for i in range(1, passes):
+        layout.append((rng.permutation(n), min(n, first_block << i)))
+
+    corrected = disclosed = 0
+    for sweep in range(max_sweeps):
+        sweep_corrected = 0
+        for order, block in layout:
+            fixed, leaked = _cascade_pass(alice, bob, order, block, blocks_known=sweep > 0)
+            sweep_corrected += fixed
+            disclosed += leaked
+        corrected += sweep_corrected
+        if sweep_corrected == 0:
+            break
+    return bob, corrected, disclosed
+
+def qber_upper_bound(qber, n_sample, z=2.0):
+    """
+    Pessimistic QBER from a sample of n_sample bits (about z standard
+    errors above the estimate). A small sample often sees no errors at
+    all; sizing Cascade blocks from that 0 leaves errors uncorrected.
+    """
+    if n_sample == 0:
+        return 0.5
+    # Never assume less than one error in the sample
+    p = max(qber, 1 / n_sample)
+    return min(0.5, p + z * np.sqrt(p * (1 - p) / n_sample))
+
+def binary_entropy(p):
+    if p <= 0 or p >= 1:
+        return 0.0
+    return float(-p * np.log2(p) - (1 - p) * np.log2(1 - p))
+
+def toeplitz_hash(bits, out_len, seed_bits):
+    """
+    Step 7: Privacy amplification. Multiplies the key by the out_len x n
+    Toeplitz matrix defined by seed_bits (n + out_len - 1 public random
+    bits), mod 2. The product is a convolution, done with one FFT.
+    `bits` may be a 2-D array of keys (one per row) hashed with the same seed.
+    """
+    n = bits.shape[-1]
+    # Circular convolution is enough: wrap-around only lands outside rows n-1 .. n+out_len-2
+    size = 1 << (seed_bits.size - 1).bit_length()
+    conv = np.fft.irfft(
+        np.fft.rfft(seed_bits.astype(np.float64), size) * np.fft.rfft(bits.astype(np.float64), size, axis=-1),
+        size, axis=-1
+    )
+    # Row i of T.x is conv[i + n - 1]
+    return (np.rint(conv[..., n - 1:n - 1 + out_len]).astype(np.int64) & 1).astype(np.uint8)
+
+def run_qkd_pipeline(n_qubits, noise=0.0, eavesdrop=0.0, sample_fraction=0.1,
+                     qber_abort=0.11, security_margin=64, rng=None):
+    """
+    Full BB84 with post-processing over one block of n_qubits:
+    transmit (noise + eavesdropper) -> sift -> QBER sample -> Cascade ->
+    Toeplitz privacy amplification. Aborts (success False) when the
+    sampled QBER exceeds qber_abort or nothing secret would be left.
+    """
+    rng = rng or _rng()
+    timings = {}
+    started = time.perf_counter()
+
+    def lap(name):
+        nonlocal started
+        now = time.perf_counter()
+        timings[name] = round((now - started) * 1e3, 3)
+        started = now
+
+    alice_bits = generate_random_bits(n_qubits)
+    alice_bases = generate_bases(n_qubits)
+    bob_bases = generate_bases(n_qubits)
+    bob_results = transmit(alice_bits, alice_bases, bob_bases, n_qubits, noise, eavesdrop, rng)
+    lap("transmit_ms")
+
+    alice, bob = sift_both(alice_bits, alice_bases, bob_bases, bob_results, n_qubits)
+    lap("sift_ms")
+
+    qber, alice, bob, n_sample = estimate_qber(alice, bob, sample_fraction, rng)
+    lap("qber_ms")
+
+    report = {
+        "qubits": n_qubits,
+        "sifted_bits": int(alice.size + n_sample),
+        "sample_bits": n_sample,
+        "qber": round(qber, 5),
+        "errors_before_correction": int(np.count_nonzero(alice != bob)),
+        "timings": timings,
+    }
+    if qber > qber_abort:
+        return {"success": False, "abort_reason": f"QBER {qber:.3f} above {qber_abort}", **report}
+
+    bob, corrected, disclosed = cascade_correct(alice, bob, qber_upper_bound(qber, n_sample), rng=rng)
+    lap("cascade_ms")
+
+    # Secret length: what Eve can't know (1 - h(QBER)), minus what Cascade disclosed
+    final_len = int(alice.size * (1 - binary_entropy(qber))) - disclosed - security_margin
+    report.update({
+        "errors_corrected": corrected,
+        "residual_errors": int(np.count_nonzero(alice != bob)),
+        "parities_disclosed": disclosed,
+        "final_bits": max(final_len, 0),
+    })
+    if final_len <= 0:
+        return {"success": False, "abort_reason": "No secret bits left after reconciliation", **report}
+
+    seed = (rng.random(alice.size + final_len - 1) < 0.5).astype(np.uint8)
+    alice_key, bob_key = np.packbits(toeplitz_hash(np.stack((alice, bob)), final_len, seed), axis=-1)
+    lap("privacy_amplification_ms")
+
+    return {
+        # Keys that still differ after Cascade fail verification and are discarded
+        "success": bool(np.array_equal(alice_key, bob_key)),
+        "final_key": alice_key.tobytes().hex(),
+        **report,
+    }
+
+def run_qkd_trials(n_qubits, noise, eavesdrop, trials, sample_fraction=0.1):
+    """
+    Monte Carlo: `trials` independent pipeline runs with the same
+    parameters. Returns per-trial sifted-key rate, sampled QBER and
+    secret-key rate (0 for aborted runs) as float arrays. Runs inside
+    a QKD executor worker, so it must stay importable and picklable.
+    """
+    rng = _rng()
+    sifted_rate = np.empty(trials)
+    qber = np.empty(trials)
+    secret_rate = np.empty(trials)
+    for i in range(trials):
+        report = run_qkd_pipeline(n_qubits, noise, eavesdrop, sample_fraction, rng=rng)
+        sifted_rate[i] = report["sifted_bits"] / n_qubits
+        qber[i] = report["qber"]
+        secret_rate[i] = report["final_bits"] / n_qubits if report["success"] else 0.0
+    return {"sifted_key_rate": sifted_rate, "qber": qber, "secret_key_rate": secret_rate}
@@ -0,0 +1,115 @@
+import re
+from typing import List
+
+import numpy as np
+
+from app.utils.ai_client import DEPARTMENTS
+
+# ---------------------------------------------------------
+# 🩺 LOCAL TRIAGE ENGINE (TF-IDF over department keywords)
+# ---------------------------------------------------------
+# No network, no token: each department is a small keyword document; a
+# diagnosis is scored against all of them with one matrix product.
+
+DEPARTMENT_KEYWORDS = {
+    "Cardiology": """heart cardiac chest pain angina arrhythmia palpitations hypertension blood pressure
+        myocardial infarction heart attack coronary artery murmur tachycardia bradycardia atrial fibrillation
+        cholesterol valve stent ecg shortness breath edema cardiomyopathy""",
+    "Neurology": """brain headache migraine seizure epilepsy stroke numbness tingling tremor parkinson
+        dizziness vertigo memory loss dementia alzheimer nerve neuropathy paralysis concussion
+        multiple sclerosis fainting syncope speech confusion""",
+    "Orthopedics": """bone fracture broken joint knee hip shoulder back pain spine sprain ligament tendon
+        arthritis osteoporosis dislocation cartilage muscle strain ankle wrist elbow scoliosis
+        injury fall swelling cast""",
+    "General Medicine": """fever cold cough flu influenza fatigue weakness infection viral nausea vomiting
+        diarrhea sore throat body ache diabetes sugar checkup weight loss appetite dehydration
+        stomach pain anemia""",
+    "Pediatrics": """child baby infant toddler newborn kid pediatric vaccination immunization growth
+        development teething colic measles chickenpox mumps school boy girl years old months old""",
+    "Dermatology": """skin rash itching itch acne eczema psoriasis mole hair loss dandruff allergy hives
+        blister wart fungal infection dry skin pigmentation burn lesion nail""",
+    "Psychiatry": """anxiety depression stress panic insomnia sleep mood bipolar schizophrenia
+        hallucination suicidal thoughts ocd adhd addiction alcohol substance mental health
+        sad hopeless behavior trauma ptsd""",
+}
+
+TOKEN = re.compile(r"[a-z]+")
+
+def tokenize(text: str) -> List[str]:
+    words = TOKEN.findall(text.lower())
+    # Unigrams plus bigrams ("chest pain", "heart attack", ...)
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+class LocalTriageEngine:
+    def __init__(self, keywords: dict = DEPARTMENT_KEYWORDS):
+        self.keywords = keywords
+        self.labels = [label for label in DEPARTMENTS if label in keywords]
+        self._vocab = None
+        self._idf = None
+        self._centroids = None   # (labels x vocab), L2-normalized
+
+    def load(self):
+        """Builds the vocabulary and department vectors (once, at startup)."""
+        if self._centroids is not None:
+            return
+        docs = [tokenize(self.keywords[label]) for label in self.labels]
+        self._vocab = {term: i for i, term in enumerate(sorted({t for doc in docs for t in doc}))}
+
+        counts = self._counts(docs)
+        df = np.count_nonzero(counts, axis=0)
+        self._idf = np.log((1 + len(docs)) / (1 + df)) + 1.0
+        self._centroids = self._normalize(counts * self._idf)
+
+    def _counts(self, token_lists) -> np.ndarray:
+        counts = np.zeros((len(token_lists), len(self._vocab)), dtype=np.float32)
+        rows, cols = [], []
+        for row, tokens in enumerate(token_lists):
+            for t in tokens:
+                col = self._vocab.get(t)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        np.add.at(counts, (rows, cols), 1.0)
+        return counts
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    def predict_many(self, texts: List[str]) -> List[dict]:
+        """Scores a whole batch with one (texts x vocab) @ (vocab x labels) product."""
+        self.load()
+        queries = self._normalize(self._counts([tokenize(t) for t in texts]) * self._idf)
+        scores = queries @ self._centroids.T
+        totals = scores.sum(axis=1)
+        best = scores.argmax(axis=1)
+
+        results = []
+        for i, total in enumerate(totals):
+            if total <= 0:
+                # Nothing recognisable: default desk, no confidence
+                results.append({"recommended_department": "General Medicine", "confidence": 0})
+                continue
+            results.append({
+                "recommended_department": self.labels[best[i]],
+                "confidence": round(float(scores[i, best[i]] / total) * 100, 1),
+            })
+        return results
+
+    # --- Same interface as AITriageClient ---
+    async def classify(self, text: str) -> dict:
+        return self.predict_many([text])[0]
+
+    async def classify_many(self, texts: List[str]) -> List[dict]:
+        return self.predict_many(texts)
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._centroids is not None,
+            "labels": len(self.labels),
+            "vocabulary": len(self._vocab) if self._vocab else 0,
+        }
+
+
+local_engine = LocalTriageEngine()
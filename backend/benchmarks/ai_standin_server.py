@@ -0,0 +1,65 @@
+"""
+Local stand-in for the zero-shot inference endpoint (same request and
+response shape as the Hugging Face API), for tests and benchmarks.
+
+Each call costs LATENCY_MS plus PER_TEXT_MS per input text, so batching
+shows up the way it does against a real model server.
+
+Run from the backend folder, then point AI_INFERENCE_URL at it:
+    python -m benchmarks.ai_standin_server
+    AI_INFERENCE_URL=http://127.0.0.1:8081/ HF_TOKEN=dummy uvicorn app.main:app
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.utils.ai_client import DEPARTMENTS
+
+HOST, PORT = "127.0.0.1", 8081
+LATENCY_MS = 50
+PER_TEXT_MS = 2
+
+
+def classify(text, labels):
+    # Deterministic fake scores, so the same text always gets the same answer
+    seed = hashlib.sha256(text.lower().encode()).digest()
+    scores = sorted(((b / 255, label) for b, label in zip(seed, labels)), reverse=True)
+    total = sum(s for s, _ in scores) or 1.0
+    return {"sequence": text, "labels": [l for _, l in scores], "scores": [s / total for s, _ in scores]}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real endpoint
+    calls = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        inputs = body["inputs"]
+        labels = body.get("parameters", {}).get("candidate_labels", DEPARTMENTS)
+        texts = inputs if isinstance(inputs, list) else [inputs]
+        Handler.calls += 1
+        time.sleep((LATENCY_MS + PER_TEXT_MS * len(texts)) / 1e3)
+
+        results = [classify(t, labels) for t in texts]
+        payload = json.dumps(results if isinstance(inputs, list) else results[0]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_in_background(port: int = PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((HOST, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    print(f"🧠 Stand-in inference server on http://{HOST}:{PORT}/")
+    ThreadingHTTPServer((HOST, PORT), Handler).serve_forever()
@@ -0,0 +1,101 @@
+"""
+Benchmark: AI triage latency and throughput, old blocking requests.post
+inside the async handler vs AITriageClient (pooled, micro-batched, cached).
+
+Runs against the local stand-in inference server. A burst of concurrent
+triage requests arrives, about a third of them repeating earlier texts.
+Meanwhile a cheap endpoint arrives every few milliseconds; its p99 shows
+how long the event loop was blocked.
+
+Run from the backend folder:
+    python -m benchmarks.bench_ai_client
+"""
+import asyncio
+import random
+import statistics
+import time
+
+import requests
+
+from benchmarks.ai_standin_server import Handler, serve_in_background, PORT
+from app.utils.ai_client import AITriageClient, CircuitBreaker, DEPARTMENTS
+from app.utils.cache import TTLCache
+
+URL = f"http://127.0.0.1:{PORT}/"
+REQUESTS = 200
+DISTINCT_TEXTS = 130
+POLL_INTERVAL_SEC = 0.005
+
+
+def make_texts():
+    rng = random.Random(7)
+    distinct = [f"Patient {i} presents with chest pain and shortness of breath" for i in range(DISTINCT_TEXTS)]
+    return [rng.choice(distinct) if i >= DISTINCT_TEXTS else distinct[i] for i in range(REQUESTS)]
+
+
+async def legacy_predict(text):
+    """The original handler body: blocking POST, new connection, no timeout."""
+    started = time.perf_counter()
+    payload = {"inputs": text, "parameters": {"candidate_labels": DEPARTMENTS}}
+    data = requests.post(URL, json=payload).json()
+    return data["labels"][0], (time.perf_counter() - started) * 1e3
+
+
+async def client_predict(client, text):
+    started = time.perf_counter()
+    result = await client.classify(text)
+    return result["recommended_department"], (time.perf_counter() - started) * 1e3
+
+
+async def poller(latencies, stop):
+    arrival = time.perf_counter()
+    while not stop.is_set():
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await asyncio.sleep(0)
+        latencies.append((time.perf_counter() - arrival) * 1e3)
+        arrival += POLL_INTERVAL_SEC
+
+
+async def scenario(name, predict, texts):
+    Handler.calls = 0
+    polls, stop = [], asyncio.Event()
+    poll_task = asyncio.create_task(poller(polls, stop))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[predict(t) for t in texts])
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await poll_task
+
+    latencies = sorted(ms for _, ms in results)
+    polls.sort()
+    print(f"{name:<14} {len(texts) / elapsed:>7.0f} req/s  "
+          f"p50={statistics.median(latencies):>7.1f} ms  p99={latencies[int(len(latencies) * 0.99) - 1]:>7.1f} ms  "
+          f"server calls={Handler.calls:>4}  other endpoints p99={polls[int(len(polls) * 0.99) - 1]:>7.1f} ms")
+
+
+async def main():
+    server = serve_in_background()
+    texts = make_texts()
+
+    client = AITriageClient(
+        url=URL, token=None, pool_size=8, connect_timeout=3, timeout=10,
+        batch_max=16, batch_window_ms=10,
+        breaker=CircuitBreaker(failures=5, reset_seconds=30),
+        cache=TTLCache(maxsize=5000, ttl=3600),
+    )
+    client.start()
+
+    await scenario("blocking", legacy_predict, texts)
+    await scenario("AITriageClient", lambda t: client_predict(client, t), texts)
+    await scenario("(warm cache)", lambda t: client_predict(client, t), texts)
+
+    print(f"\nclient stats: {client.stats()}")
+    await client.stop()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
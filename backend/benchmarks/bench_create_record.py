@@ -0,0 +1,128 @@
+"""
+Benchmark: records created per second, old create_record write path vs the
+current one.
+
+Old: uncached patient find_one -> seal -> insert_one -> find_one read-back
+-> decrypt for the response (three round trips, two decryptions).
+New: the create_record handler itself (cached identity, insert_one, response
+built from memory).
+
+MongoDB is replaced by an in-memory stand-in that costs ROUND_TRIP_MS per
+call, so the numbers show round trips and crypto, not a real server.
+
+Run from the backend folder:
+    python -m benchmarks.bench_create_record
+"""
+import asyncio
+import time
+
+from bson import ObjectId
+
+from app.api.records import create_record
+from app.core.config import settings
+from app.db import mongodb
+from app.models.record import RecordCreate
+from app.utils.encryption import seal_record_fields, key_to_binary, decrypt_records
+from app.utils.key_pool import key_pool
+from app.utils.qkd_executor import qkd_executor
+
+RECORDS = 2000
+CONCURRENCY = [1, 50]
+ROUND_TRIP_MS = 0.5
+
+PATIENT_ABHA = "12345678901234"
+DOCTOR = {"_id": ObjectId(), "role": "doctor", "full_name": "Dr. Bench", "hospital": "hospitalA"}
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = {}
+        self.calls = 0
+
+    async def _round_trip(self):
+        self.calls += 1
+        await asyncio.sleep(ROUND_TRIP_MS / 1e3)
+
+    async def insert_one(self, doc):
+        await self._round_trip()
+        doc.setdefault("_id", ObjectId())
+        self.docs[doc["_id"]] = dict(doc)
+        return type("InsertOneResult", (), {"inserted_id": doc["_id"]})()
+
+    async def find_one(self, query, projection=None):
+        await self._round_trip()
+        if "_id" in query:
+            doc = self.docs.get(query["_id"])
+            return dict(doc) if doc else None
+        for doc in self.docs.values():
+            if all(doc.get(k) == v for k, v in query.items()):
+                return dict(doc)
+        return None
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+async def legacy_create_record(record: RecordCreate, current_user: dict):
+    db = await mongodb.get_database()
+    patient = await db["users"].find_one({"abha_number": record.patient_abha})
+    secret_key = await key_pool.take()
+
+    record_dict = record.model_dump()
+    record_dict["sealed_fields"] = seal_record_fields(record_dict, secret_key)
+    del record_dict["diagnosis"], record_dict["prescription"]
+    record_dict["storage_format"] = 2
+    record_dict["quantum_key"] = key_to_binary(secret_key)
+    record_dict["doctor_id"] = current_user["_id"]
+    record_dict["doctor_name"] = current_user["full_name"]
+    record_dict["hospital"] = current_user.get("hospital", "Unknown")
+    record_dict["patient_id"] = str(patient["_id"])
+    record_dict["patient_abha"] = patient.get("abha_number", "N/A")
+
+    new_record = await db["records"].insert_one(record_dict)
+    created_record = await db["records"].find_one({"_id": new_record.inserted_id})
+    decrypt_records([created_record])
+    created_record["_id"] = str(created_record["_id"])
+    return created_record
+
+
+async def scenario(name, handler, concurrency):
+    database = FakeDB()
+    await database["users"].insert_one({"email": "patient@example.com", "abha_number": PATIENT_ABHA})
+    database["users"].calls = 0
+    mongodb.db.client = {settings.DB_NAME: database}
+
+    record = RecordCreate(patient_abha=PATIENT_ABHA, diagnosis="Seasonal influenza", prescription="Rest and fluids")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await handler(record, current_user=DOCTOR)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(RECORDS)])
+    elapsed = time.perf_counter() - started
+
+    calls = database["users"].calls + database["records"].calls
+    print(f"{name:<10} concurrency={concurrency:>3}  {RECORDS / elapsed:>8.0f} records/s  "
+          f"db calls/record={calls / RECORDS:.2f}")
+
+
+async def main():
+    await qkd_executor.start()
+    await key_pool.start()
+    await asyncio.sleep(1.0)  # let the pool fill so both paths get pooled keys
+
+    for concurrency in CONCURRENCY:
+        await scenario("old", legacy_create_record, concurrency)
+        await scenario("new", create_record, concurrency)
+
+    await key_pool.stop()
+    await qkd_executor.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""
+Benchmark: decrypting large record reads (government ABHA lookups, big
+pages, exports) inline vs through DecryptionPool.
+
+Each record is a v2 document with its own quantum key, so every record pays
+the full key setup, as it does on a real read.
+
+Run from the backend folder:
+    python -m benchmarks.bench_decrypt_pool
+"""
+import asyncio
+import os
+import time
+
+from app.utils.decrypt_pool import DecryptionPool
+from app.utils.encryption import decrypt_records, key_to_binary, seal_record_fields
+
+RECORD_COUNTS = [100, 1_000, 10_000]
+WORKERS = [2, 4]
+
+
+def make_records(n):
+    records = []
+    for _ in range(n):
+        key = os.urandom(32).hex()
+        fields = {"diagnosis": "Seasonal influenza", "prescription": "Rest and fluids"}
+        records.append({
+            "sealed_fields": seal_record_fields(fields, key),
+            "storage_format": 2,
+            "quantum_key": key_to_binary(key),
+        })
+    return records
+
+
+def fresh(records):
+    return [dict(rec) for rec in records]
+
+
+async def main():
+    pools = {w: DecryptionPool(workers=w, threshold=0) for w in WORKERS}
+    for pool in pools.values():
+        pool.start()
+
+    header = f"{'records':>8} {'inline (ms)':>12}" + "".join(f" {f'{w} threads (ms)':>16}" for w in WORKERS)
+    print(header)
+    for n in RECORD_COUNTS:
+        records = make_records(n)
+
+        batch = fresh(records)
+        started = time.perf_counter()
+        decrypt_records(batch)
+        row = f"{n:>8} {(time.perf_counter() - started) * 1e3:>12.1f}"
+
+        for w in WORKERS:
+            batch = fresh(records)
+            elapsed = await pools[w].decrypt(batch)
+            assert all(rec["diagnosis"] == "Seasonal influenza" for rec in batch)
+            row += f" {elapsed:>16.1f}"
+        print(row)
+
+    for pool in pools.values():
+        pool.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
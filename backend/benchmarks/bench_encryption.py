@@ -0,0 +1,54 @@
+"""
+Microbenchmark: decrypting a page of records (diagnosis + prescription,
+one quantum key per record), the original per-call decrypt_data vs
+decrypt_many. Every key is used for one record only, so there is nothing
+to cache: both columns pay Fernet's HMAC/AES work per field and should
+come out level. decrypt_many is a batching API, not a speedup.
+
+Run from the backend folder:
+    python -m benchmarks.bench_encryption
+"""
+import base64
+import os
+import time
+
+from cryptography.fernet import Fernet
+
+from app.utils.encryption import decrypt_many, encrypt_many
+
+RECORD_COUNTS = [100, 10_000]
+
+
+def legacy_decrypt(token, key_hex):
+    """The original decrypt_data: a fresh Fernet object on every call."""
+    f = Fernet(base64.urlsafe_b64encode(bytes.fromhex(key_hex[:64])))
+    return f.decrypt(token.encode()).decode()
+
+
+def make_records(n):
+    keys = [os.urandom(32).hex() for _ in range(n)]
+    tokens = encrypt_many(
+        [(text, key) for key in keys for text in ("Seasonal influenza", "Rest and fluids")]
+    )
+    return [(tokens[2 * i], tokens[2 * i + 1], key) for i, key in enumerate(keys)]
+
+
+def time_ms(fn):
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1e3
+
+
+def main():
+    print(f"{'records':>8} {'legacy (ms)':>12} {'decrypt_many (ms)':>18}")
+    for n in RECORD_COUNTS:
+        records = make_records(n)
+        pairs = [(token, key) for diag, presc, key in records for token in (diag, presc)]
+
+        legacy = time_ms(lambda: [legacy_decrypt(token, key) for token, key in pairs])
+        batched = time_ms(lambda: decrypt_many(pairs))
+        print(f"{n:>8} {legacy:>12.1f} {batched:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
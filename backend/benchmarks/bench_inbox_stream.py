@@ -0,0 +1,129 @@
+"""
+Benchmark: MongoDB operations per minute for 500 idle connected doctors,
+15-second inbox polling vs the /inbox/stream push channel.
+
+Polling: every doctor calls GET /my-inbox every 15 s (auth + inbox query).
+Streaming: every doctor authenticates once when the stream opens; after
+that the database is only touched when a transfer actually arrives (each
+doctor at the receiving hospital refetches /my-inbox once).
+
+The real handlers and InboxBroker run against an in-memory stand-in that
+counts calls, over one simulated minute.
+
+Run from the backend folder:
+    python -m benchmarks.bench_inbox_stream
+"""
+import asyncio
+
+from bson import ObjectId
+
+from app.api import auth
+from app.api.transfer import get_my_hospital_inbox, inbox_key
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db import mongodb
+from app.utils.inbox_events import InboxBroker
+
+DOCTORS = 500
+HOSPITALS = ["hospitalA", "hospitalB", "hospitalC"]
+POLL_INTERVAL_SEC = 15
+TRANSFERS_PER_MINUTE = [0, 10]
+
+
+class FakeCursor:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def limit(self, n):
+        return self
+
+    async def to_list(self, length=None):
+        self.collection.ops += 1
+        return []
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = docs or {}
+        self.ops = 0
+
+    def find(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    async def find_one(self, query, *args, **kwargs):
+        self.ops += 1
+        return self.docs.get(query.get("email"))
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+    def total_ops(self):
+        return sum(c.ops for c in self.values())
+
+
+def make_doctors():
+    doctors = []
+    for i in range(DOCTORS):
+        email = f"doctor{i}@example.com"
+        doctors.append({"_id": ObjectId(), "email": email, "full_name": f"Doctor {i}",
+                        "role": "doctor", "hospital": HOSPITALS[i % len(HOSPITALS)]})
+    return doctors
+
+
+def setup(doctors):
+    db = FakeDB()
+    db["users"] = FakeCollection({d["email"]: dict(d) for d in doctors})
+    mongodb.db.client = {settings.DB_NAME: db}
+    auth.user_cache.clear()
+    tokens = [create_access_token({"sub": d["email"]}) for d in doctors]
+    return db, tokens
+
+
+async def polling_minute(doctors):
+    db, tokens = setup(doctors)
+    for _ in range(60 // POLL_INTERVAL_SEC):
+        for token in tokens:
+            user = await auth.get_current_user_claims(token)
+            await get_my_hospital_inbox(current_user=user, db=db)
+    return db.total_ops()
+
+
+async def streaming_minute(doctors, transfers):
+    db, tokens = setup(doctors)
+    broker = InboxBroker(queue_size=settings.INBOX_STREAM_QUEUE_SIZE)
+
+    # Stream opened: one authentication per doctor
+    streams = []
+    for token in tokens:
+        user = await auth.get_current_user_claims(token)
+        streams.append((user, token, broker.subscribe(inbox_key(user["hospital"]))))
+    connect_ops = db.total_ops()
+
+    for i in range(transfers):
+        broker.publish(inbox_key(HOSPITALS[i % len(HOSPITALS)]), {"count": 1, "sender": "bench"})
+        # Each notified doctor refetches the inbox once
+        for user, token, queue in streams:
+            while not queue.empty():
+                queue.get_nowait()
+                await get_my_hospital_inbox(current_user=await auth.get_current_user_claims(token), db=db)
+    return connect_ops, db.total_ops() - connect_ops
+
+
+async def main():
+    doctors = make_doctors()
+    print(f"{DOCTORS} doctors, one simulated minute")
+    print(f"{'transfers/min':>13} {'polling ops/min':>16} {'stream ops/min':>15} {'stream connect ops':>19}")
+    for transfers in TRANSFERS_PER_MINUTE:
+        polled = await polling_minute(doctors)
+        connect, pushed = await streaming_minute(doctors, transfers)
+        print(f"{transfers:>13} {polled:>16} {pushed:>15} {connect:>19}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""
+Benchmark: per-session BB84 latency, legacy list engine vs bit-packed engine,
+and n sessions run one by one vs as a single batch.
+
+Run from the backend folder:
+    python -m benchmarks.bench_qkd
+"""
+import hashlib
+import random
+import timeit
+
+from app.utils.quantum import run_bb84_session, simulate_qkd_exchange, simulate_qkd_exchange_batch
+
+QUBIT_COUNTS = [128, 512, 2048, 8192, 32768]
+BATCH_SIZES = [1, 10, 100, 500, 1000]
+
+
+def legacy_session(n_qubits):
+    """The original per-qubit list implementation, kept here for comparison."""
+    alice_bits = [random.randint(0, 1) for _ in range(n_qubits)]
+    alice_bases = [random.randint(0, 1) for _ in range(n_qubits)]
+    bob_bases = [random.randint(0, 1) for _ in range(n_qubits)]
+    bob_results = []
+    for i in range(n_qubits):
+        if alice_bases[i] == bob_bases[i]:
+            bob_results.append(alice_bits[i])
+        else:
+            bob_results.append(random.randint(0, 1))
+    sifted = [bob_results[i] for i in range(n_qubits) if alice_bases[i] == bob_bases[i]]
+    return hashlib.sha256("".join(map(str, sifted)).encode()).hexdigest()
+
+
+def packed_session(n_qubits):
+    key, _ = run_bb84_session(n_qubits)
+    return hashlib.sha256(key.tobytes()).hexdigest()
+
+
+def per_session_us(fn, n_qubits):
+    return per_call_us(lambda: fn(n_qubits))
+
+
+def per_call_us(call):
+    timer = timeit.Timer(call)
+    loops, _ = timer.autorange()
+    best = min(timer.repeat(repeat=5, number=loops))
+    return best / loops * 1e6
+
+
+def main():
+    print(f"{'qubits':>8} {'legacy (us)':>14} {'packed (us)':>14} {'speedup':>9}")
+    for n in QUBIT_COUNTS:
+        legacy = per_session_us(legacy_session, n)
+        packed = per_session_us(packed_session, n)
+        print(f"{n:>8} {legacy:>14.1f} {packed:>14.1f} {legacy / packed:>8.1f}x")
+
+    print()
+    print(f"{'sessions':>8} {'one-by-one (ms)':>16} {'batch (ms)':>12} {'speedup':>9}")
+    for n in BATCH_SIZES:
+        single = per_call_us(lambda: [simulate_qkd_exchange() for _ in range(n)]) / 1e3
+        batch = per_call_us(lambda: simulate_qkd_exchange_batch(n)) / 1e3
+        print(f"{n:>8} {single:>16.2f} {batch:>12.2f} {single / batch:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark: local triage engine, per-request latency (one text per call,
+like /predict-department) and batch throughput (/predict-department/batch).
+
+Run from the backend folder:
+    python -m benchmarks.bench_triage_engine
+"""
+import random
+import statistics
+import time
+
+from app.utils.triage_engine import LocalTriageEngine, DEPARTMENT_KEYWORDS
+
+SINGLE_REQUESTS = 2000
+BATCH_SIZES = [1, 10, 100, 1000, 10_000]
+
+
+def make_texts(n):
+    rng = random.Random(11)
+    words = [w for kws in DEPARTMENT_KEYWORDS.values() for w in kws.split()]
+    filler = "patient reports since last week with mild persistent".split()
+    return [" ".join(rng.choices(words, k=3) + rng.choices(filler, k=5)) for _ in range(n)]
+
+
+def main():
+    engine = LocalTriageEngine()
+    started = time.perf_counter()
+    engine.load()
+    print(f"load: {(time.perf_counter() - started) * 1e3:.1f} ms  {engine.stats()}")
+
+    latencies = []
+    for text in make_texts(SINGLE_REQUESTS):
+        started = time.perf_counter()
+        engine.predict_many([text])
+        latencies.append((time.perf_counter() - started) * 1e3)
+    latencies.sort()
+    print(f"\nsingle text: p50={statistics.median(latencies):.3f} ms  "
+          f"p99={latencies[int(len(latencies) * 0.99) - 1]:.3f} ms")
+
+    print(f"\n{'batch':>7} {'total (ms)':>11} {'texts/s':>10}")
+    for n in BATCH_SIZES:
+        texts = make_texts(n)
+        started = time.perf_counter()
+        engine.predict_many(texts)
+        elapsed = time.perf_counter() - started
+        print(f"{n:>7} {elapsed * 1e3:>11.2f} {n / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Load test: inbox-poll latency while bulk transfers hammer key generation.
+
+A stand-in for GET /my-inbox (a tiny coroutine with one awaited I/O hop)
+arrives every few milliseconds while several bulk-transfer tasks keep
+generating batches of QKD keys, either inline on the event loop (the old
+behaviour) or through the QKD process pool.
+
+Run from the backend folder:
+    python -m benchmarks.load_qkd_executor
+"""
+import asyncio
+import statistics
+import time
+
+from app.utils.qkd_executor import QKDExecutor
+from app.utils.quantum import simulate_qkd_exchange_batch
+
+DURATION_SEC = 5.0
+POLL_INTERVAL_SEC = 0.005
+BULK_TRANSFERS = 4
+RECORDS_PER_TRANSFER = 500
+
+
+async def inbox_poll():
+    await asyncio.sleep(0)  # the Mongo round trip, as far as the loop is concerned
+
+
+async def poller(latencies, stop):
+    # Open loop: requests "arrive" on a fixed schedule whether or not the
+    # loop is free, and latency is measured from arrival to completion.
+    arrival = time.perf_counter()
+    while not stop.is_set():
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await inbox_poll()
+        latencies.append((time.perf_counter() - arrival) * 1e3)
+        arrival += POLL_INTERVAL_SEC
+
+
+async def bulk_transfer_inline(stop):
+    while not stop.is_set():
+        simulate_qkd_exchange_batch(RECORDS_PER_TRANSFER)
+        await asyncio.sleep(0)
+
+
+async def bulk_transfer_executor(executor, stop):
+    while not stop.is_set():
+        await executor.generate_keys(RECORDS_PER_TRANSFER)
+
+
+async def scenario(name, make_load):
+    latencies, stop = [], asyncio.Event()
+    tasks = [asyncio.create_task(poller(latencies, stop))]
+    tasks += [asyncio.create_task(make_load(stop)) for _ in range(BULK_TRANSFERS)]
+    await asyncio.sleep(DURATION_SEC)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{name:<28} polls={len(latencies):>6}  p50={p50:>7.3f} ms  p99={p99:>7.3f} ms")
+
+
+async def main():
+    async def idle(stop):
+        await stop.wait()
+
+    executor = QKDExecutor(workers=2, max_pending=BULK_TRANSFERS)
+    await executor.start()
+
+    await scenario("idle", idle)
+    await scenario("bulk keys inline on loop", bulk_transfer_inline)
+    await scenario("bulk keys in process pool", lambda stop: bulk_transfer_executor(executor, stop))
+
+    await executor.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+"""
+Index check: ensures the declared indexes, then runs explain() on every hot
+query and fails (exit code 1) if any of them still does a collection scan
+or an in-memory sort.
+
+Needs a reachable MongoDB (MONGODB_URL / DB_NAME from .env). Run from the
+backend folder:
+    python -m scripts.check_indexes
+"""
+import asyncio
+import sys
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.db.indexes import explain_hot_queries, index_report
+
+
+async def main():
+    await connect_to_mongo()   # also runs ensure_indexes
+    db = await get_database()
+
+    failures = 0
+    for name, stages, indexed in await explain_hot_queries(db):
+        mark = "✅" if indexed else "❌"
+        failures += not indexed
+        print(f"{mark} {name:<26} {' <- '.join(stages)}")
+
+    report = await index_report(db)
+    for collection, entry in report.items():
+        if entry["missing"]:
+            failures += 1
+            print(f"❌ {collection}: missing {entry['missing']}")
+
+    await close_mongo_connection()
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(main()) else 0)
@@ -0,0 +1,195 @@
+"""
+Buffered audit writer against a fake audit_logs collection: partial bulk
+failures (duplicate-key vs real errors), held entries spilled at stop() and
+loaded back at start(), and backpressure on a full queue. Run from the
+backend folder:
+    python -m pytest tests
+"""
+import asyncio
+import importlib
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+
+@pytest.fixture
+def audit(monkeypatch):
+    # Settings need a MongoDB URL to load; nothing here connects to it
+    monkeypatch.setenv("MONGODB_URL", "mongodb://localhost:1")
+    module = importlib.import_module("app.utils.audit_writer")
+    db = FakeDatabase()
+
+    async def get_database():
+        return db
+
+    monkeypatch.setattr(module, "get_database", get_database)
+    return module, db
+
+
+class FakeCollection:
+    """
+    insert_many stamps _id on every dict first, as pymongo does, then either
+    stores them or applies the next scripted failure.
+    """
+    def __init__(self):
+        self.docs = []
+        self.calls = []
+        self.failures = []     # per call: None (succeed), an exception, or {index: error code}
+        self.gate = None       # asyncio.Event that insert_many waits for
+        self.rollup_ops = []
+
+    async def insert_many(self, docs, ordered=True):
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+        self.calls.append(list(docs))
+        if self.gate is not None:
+            await self.gate.wait()
+        failure = self.failures.pop(0) if self.failures else None
+        if isinstance(failure, Exception):
+            raise failure
+        if failure:
+            self.docs += [doc for i, doc in enumerate(docs) if i not in failure]
+            raise BulkWriteError({
+                "writeErrors": [{"index": i, "code": code, "errmsg": "scripted"} for i, code in failure.items()],
+                "nInserted": len(docs) - len(failure),
+            })
+        self.docs += docs
+
+    async def bulk_write(self, ops, ordered=True):
+        self.rollup_ops += ops
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.collections = {}
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+
+def entries(module, n, sender="hospitalA"):
+    from app.models.record import AuditLog
+    return [
+        AuditLog(sender_hospital=sender, sender_doctor="Doc A", receiver_hospital="hospitalB",
+                 record_id=f"record-{i}", qkd_key_id=f"key-{i}")
+        for i in range(n)
+    ]
+
+
+def writer(module, tmp_path, **overrides):
+    options = dict(max_queue=100, batch_size=50, flush_interval=0.01, retry_interval=0.05,
+                   spill_path=str(tmp_path / "audit_spill.jsonl"))
+    options.update(overrides)
+    return module.AuditWriter(**options)
+
+
+def rollup_totals(collection):
+    totals = {}
+    for op in collection.rollup_ops:
+        hospital = op._filter["hospital"]
+        for field, n in op._doc["$inc"].items():
+            totals[(hospital, field)] = totals.get((hospital, field), 0) + n
+    return totals
+
+
+def test_retries_only_rows_that_really_failed(audit, tmp_path):
+    module, db = audit
+    logs = db["audit_logs"]
+    # Attempt 1: row 1 hits a duplicate key (already written), row 2 a real error
+    logs.failures = [{1: module.DUPLICATE_KEY, 2: 91}]
+
+    async def run():
+        w = writer(module, tmp_path)
+        await w.write(entries(module, 4))     # not started: written straight through
+        return w
+
+    w = asyncio.run(run())
+
+    assert [len(call) for call in logs.calls] == [4, 1]
+    assert logs.calls[1][0]["record_id"] == "record-2"   # same dict, same _id, resent alone
+    assert sorted(doc["record_id"] for doc in logs.docs) == ["record-0", "record-2", "record-3"]
+    assert w.written == 4 and w.failed == 0 and not w._held
+    # Rollups count every written row once, including the duplicate
+    assert rollup_totals(db["audit_rollups"]) == {
+        ("hospitalA", "sent"): 4, ("hospitalA", "received"): 0,
+        ("hospitalB", "sent"): 0, ("hospitalB", "received"): 4,
+    }
+
+
+def test_rollups_skip_rows_that_were_not_written(audit, tmp_path):
+    module, db = audit
+    logs = db["audit_logs"]
+    # Row 0 keeps failing for real on every attempt; the others go in first time
+    logs.failures = [{0: 91}, {0: 91}, {0: 91}]
+
+    async def run():
+        w = writer(module, tmp_path)
+        await w.write(entries(module, 3))
+        return w
+
+    w = asyncio.run(run())
+
+    assert w.written == 2 and w.failed == 1
+    assert [e["record_id"] for e in w._held] == ["record-0"]
+    assert rollup_totals(db["audit_rollups"])[("hospitalB", "received")] == 2
+
+
+def test_held_entries_spill_at_stop_and_load_at_start(audit, tmp_path):
+    module, db = audit
+    logs = db["audit_logs"]
+    spill = tmp_path / "audit_spill.jsonl"
+    logs.failures = [AutoReconnect("down")] * 3
+
+    async def first_run():
+        w = writer(module, tmp_path)
+        await w.start()
+        await w.write(entries(module, 3))
+        await w.stop()     # drains: every attempt fails, so the entries are spilled
+        return w
+
+    w = asyncio.run(first_run())
+    assert logs.docs == []
+    assert w.spilled == 3 and not w._held
+    assert len(spill.read_text().splitlines()) == 3
+    first_ids = [call["_id"] for call in logs.calls[0]]
+
+    async def second_run():
+        w = writer(module, tmp_path)
+        await w.start()
+        loaded = w.stats()["held"]
+        await asyncio.sleep(0.2)   # the retry interval passes: held entries are flushed
+        await w.stop()
+        return w, loaded
+
+    w, loaded = asyncio.run(second_run())
+    assert loaded == 3
+    assert not spill.exists()
+    assert [doc["_id"] for doc in logs.docs] == first_ids     # same rows, same _ids
+    assert [doc["record_id"] for doc in logs.docs] == ["record-0", "record-1", "record-2"]
+    assert w.written == 3 and w.spilled == 0
+
+
+def test_full_queue_applies_backpressure_instead_of_dropping(audit, tmp_path):
+    module, db = audit
+    logs = db["audit_logs"]
+
+    async def run():
+        logs.gate = asyncio.Event()    # the database is stalled
+        w = writer(module, tmp_path, max_queue=5, batch_size=2)
+        await w.start()
+        producer = asyncio.create_task(w.write(entries(module, 20)))
+        await asyncio.sleep(0.1)
+
+        stalled = (producer.done(), w.stats()["queue_depth"], w.backpressure_waits)
+        logs.gate.set()
+        await asyncio.wait_for(producer, 5)
+        await w.stop()
+        return w, stalled
+
+    w, (done, depth, waits) = asyncio.run(run())
+
+    assert not done                # write() waited for room...
+    assert depth == 5 and waits >= 1
+    assert w.enqueued == 20 == w.written     # ...and nothing was dropped
+    assert sorted(doc["record_id"] for doc in logs.docs) == sorted(f"record-{i}" for i in range(20))
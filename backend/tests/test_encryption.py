@@ -0,0 +1,137 @@
+"""
+Record storage formats: v1 Fernet tokens and v2 AES-GCM blobs, read through
+decrypt_data / decrypt_records. Run from the backend folder:
+    python -m pytest tests
+"""
+import os
+
+import pytest
+from bson import Binary
+from cryptography.exceptions import InvalidTag
+
+from app.utils.encryption import (
+    DECRYPT_FAILED,
+    FORMAT_V2,
+    decrypt_data,
+    decrypt_many_checked,
+    decrypt_records,
+    encrypt_data,
+    key_to_binary,
+    seal_data,
+    seal_record_fields,
+)
+
+
+def new_key() -> str:
+    return os.urandom(32).hex()
+
+
+def v1_record(diagnosis, prescription, key):
+    return {"diagnosis": encrypt_data(diagnosis, key), "prescription": encrypt_data(prescription, key), "quantum_key": key}
+
+
+def v2_record(diagnosis, prescription, key):
+    return {
+        "sealed_fields": seal_record_fields({"diagnosis": diagnosis, "prescription": prescription}, key),
+        "storage_format": 2,
+        "quantum_key": key_to_binary(key),
+    }
+
+
+def tampered(blob: Binary) -> Binary:
+    raw = bytearray(blob)
+    raw[-1] ^= 0x01   # last byte of the GCM tag
+    return Binary(bytes(raw))
+
+
+def test_v1_token_round_trips():
+    key = new_key()
+    token = encrypt_data("Fever, 3 days", key)
+    assert isinstance(token, str)
+    assert decrypt_data(token, key) == "Fever, 3 days"
+
+
+def test_v2_blob_round_trips():
+    key = new_key()
+    blob = seal_data("Fever, 3 days", key)
+    assert isinstance(blob, Binary)
+    assert bytes(blob)[:1] == FORMAT_V2
+    assert decrypt_data(blob, key) == "Fever, 3 days"
+    # The key is read the same way whether stored as hex text or raw bytes
+    assert decrypt_data(blob, key_to_binary(key)) == "Fever, 3 days"
+
+
+def test_v2_blobs_use_fresh_nonces():
+    key = new_key()
+    assert seal_data("same text", key) != seal_data("same text", key)
+
+
+def test_tampered_v2_blob_fails():
+    key = new_key()
+    with pytest.raises(InvalidTag):
+        decrypt_data(tampered(seal_data("Fever", key)), key)
+
+
+def test_unknown_format_tag_fails():
+    with pytest.raises(ValueError):
+        decrypt_data(Binary(b"\x09" + os.urandom(40)), new_key())
+
+
+def test_decrypt_records_opens_v1_and_v2():
+    k1, k2 = new_key(), new_key()
+    records = decrypt_records([v1_record("flu", "rest", k1), v2_record("asthma", "inhaler", k2)])
+
+    assert [(r["diagnosis"], r["prescription"]) for r in records] == [("flu", "rest"), ("asthma", "inhaler")]
+    assert "sealed_fields" not in records[1]
+    assert records[1]["quantum_key"] == k2   # normalized to the hex key id
+    assert not any(r.get(DECRYPT_FAILED) for r in records)
+
+
+def test_tampered_v2_record_is_flagged():
+    key = new_key()
+    record = v2_record("asthma", "inhaler", key)
+    record["sealed_fields"] = tampered(record["sealed_fields"])
+
+    (opened,) = decrypt_records([record])
+
+    assert opened[DECRYPT_FAILED] is True
+    assert opened["diagnosis"] == opened["prescription"] == "Decryption Error"
+    assert "sealed_fields" not in opened
+
+
+def test_v1_record_with_wrong_key_is_flagged():
+    record = v1_record("flu", "rest", new_key())
+    record["quantum_key"] = new_key()
+
+    (opened,) = decrypt_records([record])
+    assert opened[DECRYPT_FAILED] is True
+
+
+def test_mixed_lists_keep_their_order():
+    keys = [new_key() for _ in range(6)]
+    records = []
+    for i, key in enumerate(keys):
+        build = v1_record if i % 2 else v2_record
+        records.append(build(f"diagnosis {i}", f"prescription {i}", key))
+    records.insert(3, {"diagnosis": "plain", "prescription": "plain"})   # no key: left as is
+    records[2]["sealed_fields"] = tampered(records[2]["sealed_fields"])    # a v2 failure mid-list
+
+    opened = decrypt_records(records)
+
+    assert opened is records
+    assert [r["diagnosis"] for r in opened] == [
+        "diagnosis 0", "diagnosis 1", "Decryption Error", "plain", "diagnosis 3", "diagnosis 4", "diagnosis 5",
+    ]
+    assert [r["prescription"] for r in opened][4:] == ["prescription 3", "prescription 4", "prescription 5"]
+    assert [bool(r.get(DECRYPT_FAILED)) for r in opened] == [False, False, True, False, False, False, False]
+
+
+def test_decrypt_many_checked_mixes_formats_in_order():
+    k1, k2 = new_key(), new_key()
+    items = [(seal_data("a", k1), k1), (encrypt_data("b", k2), k2), ("not a token", k1), (seal_data("d", k2), k2)]
+
+    results, ok = decrypt_many_checked(items)
+
+    assert ok == [True, True, False, True]
+    assert results[:2] == ["a", "b"] and results[3] == "d"
+    assert results[2] == "not a token"   # failures come back unchanged
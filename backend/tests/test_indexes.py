@@ -0,0 +1,39 @@
+"""
+Every hot query must be served by an index: ensures the declared indexes on
+a scratch database, runs explain() on each HOT_QUERIES shape and fails on
+any COLLSCAN or blocking SORT stage in a winning plan.
+
+Needs a reachable MongoDB; skipped when MONGODB_URL is unset. Run from the
+backend folder:
+    MONGODB_URL=mongodb://localhost:27017 python -m pytest tests
+"""
+import asyncio
+import os
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not os.environ.get("MONGODB_URL"), reason="MONGODB_URL not set (needs MongoDB)")
+
+# Dropped afterwards, so never point this at a real database
+TEST_DB_NAME = os.environ.get("INDEX_TEST_DB_NAME", "hospital_db_index_test")
+
+
+async def explain_on_scratch_db():
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.db.indexes import ensure_indexes, explain_hot_queries
+
+    client = AsyncIOMotorClient(os.environ["MONGODB_URL"], serverSelectionTimeoutMS=5000)
+    try:
+        db = client[TEST_DB_NAME]
+        await ensure_indexes(db)
+        return await explain_hot_queries(db)
+    finally:
+        await client.drop_database(TEST_DB_NAME)
+        client.close()
+
+
+def test_hot_queries_use_indexes():
+    results = asyncio.run(explain_on_scratch_db())
+    assert results
+    bad = [f"{name}: {' <- '.join(stages)}" for name, stages, indexed in results if not indexed]
+    assert not bad, "Collection scans or in-memory sorts on hot queries:\n" + "\n".join(bad)
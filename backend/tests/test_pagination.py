@@ -0,0 +1,87 @@
+"""
+Keyset pagination cursors (newest first on (<time field>, _id)): round trip,
+malformed cursors, and page boundaries inside a run of equal timestamps.
+Run from the backend folder:
+    python -m pytest tests
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def b64(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def test_cursor_round_trip():
+    when = datetime(2025, 3, 14, 15, 9, 26, 535000)
+    last_id = ObjectId()
+
+    query = decode_cursor(encode_cursor({"created_at": when, "_id": last_id}, "created_at"), "created_at")
+
+    assert query == {
+        "created_at": {"$lte": when},
+        "$or": [{"created_at": {"$lt": when}}, {"_id": {"$lt": last_id}}],
+    }
+
+
+def test_cursor_is_opaque_text():
+    cursor = encode_cursor({"timestamp": datetime(2025, 1, 1), "_id": ObjectId()}, "timestamp")
+    assert isinstance(cursor, str)
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "!!not base64!!",
+    b64("not json"),
+    b64("[1, 2]"),
+    b64(json.dumps({"c": "2025-01-01T00:00:00"})),                                  # no _id
+    b64(json.dumps({"c": "yesterday", "i": str(ObjectId())})),                     # bad time
+    b64(json.dumps({"c": "2025-01-01T00:00:00", "i": "not-an-object-id"})),        # bad _id
+])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "created_at")
+    assert error.value.status_code == 400
+
+
+def walk_pages(collection, query, field, limit):
+    """Pages exactly like get_my_records / audit-logs: limit + 1, cursor from the last row."""
+    pages, cursor = [], None
+    while True:
+        page_query = {"$and": [query, decode_cursor(cursor, field)]} if cursor else query
+        rows = list(collection.find(page_query).sort([(field, -1), ("_id", -1)]).limit(limit + 1))
+        more = len(rows) > limit
+        rows = rows[:limit]
+        pages.append([row["_id"] for row in rows])
+        if not more:
+            return pages
+        cursor = encode_cursor(rows[-1], field)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 20])
+def test_pages_split_equal_timestamps_by_id(limit):
+    mongomock = pytest.importorskip("mongomock")
+    records = mongomock.MongoClient().db.records
+
+    base = datetime(2025, 6, 1, 12, 0, 0)
+    # A burst of records sharing one created_at (e.g. a batch import) between older and newer ones
+    times = [base + timedelta(minutes=5), base + timedelta(minutes=1)] + [base] * 6 + [base - timedelta(minutes=3)]
+    for when in times:
+        records.insert_one({"hospital": "hospitalA", "created_at": when})
+    records.insert_one({"hospital": "hospitalB", "created_at": base})   # filtered out
+
+    pages = walk_pages(records, {"hospital": "hospitalA"}, "created_at", limit)
+    seen = [rid for page in pages for rid in page]
+
+    expected = [doc["_id"] for doc in records.find({"hospital": "hospitalA"}).sort([("created_at", -1), ("_id", -1)])]
+    assert seen == expected                      # every record once, in order
+    assert len(seen) == len(set(seen)) == len(times)
+    assert all(len(page) <= limit for page in pages)
@@ -0,0 +1,108 @@
+"""
+Noisy-channel BB84 post-processing: Toeplitz hashing, Cascade, the QBER
+abort and the secret-key length. Run from the backend folder:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from app.utils.quantum import (
+    binary_entropy,
+    cascade_correct,
+    qber_upper_bound,
+    run_qkd_pipeline,
+    toeplitz_hash,
+)
+
+
+def random_bits(rng, n):
+    return (rng.random(n) < 0.5).astype(np.uint8)
+
+
+@pytest.mark.parametrize("n, out_len", [(16, 5), (1000, 300), (4096, 1)])
+def test_toeplitz_hash_matches_dense_product(n, out_len):
+    rng = np.random.default_rng(7)
+    bits = random_bits(rng, n)
+    seed = random_bits(rng, n + out_len - 1)
+
+    # T[i, j] = seed[i - j + n - 1]: constant along every diagonal
+    i, j = np.indices((out_len, n))
+    dense = seed[i - j + n - 1]
+    expected = (dense.astype(np.int64) @ bits) % 2
+
+    assert np.array_equal(toeplitz_hash(bits, out_len, seed), expected)
+
+
+def test_toeplitz_hash_rows_hash_independently():
+    rng = np.random.default_rng(8)
+    keys = np.stack([random_bits(rng, 500), random_bits(rng, 500)])
+    seed = random_bits(rng, 500 + 120 - 1)
+
+    hashed = toeplitz_hash(keys, 120, seed)
+    assert np.array_equal(hashed[0], toeplitz_hash(keys[0], 120, seed))
+    assert np.array_equal(hashed[1], toeplitz_hash(keys[1], 120, seed))
+
+
+@pytest.mark.parametrize("n, k", [(4096, 1), (4096, 80), (10000, 300)])
+def test_cascade_recovers_known_flips(n, k):
+    rng = np.random.default_rng(n + k)
+    alice = random_bits(rng, n)
+    bob = alice.copy()
+    bob[rng.choice(n, size=k, replace=False)] ^= 1
+
+    corrected_bob, corrected, disclosed = cascade_correct(alice, bob, k / n, rng=rng)
+
+    assert np.array_equal(corrected_bob, alice)
+    assert corrected == k
+    assert 0 < disclosed < n
+    assert np.count_nonzero(bob != alice) == k   # input left untouched
+
+
+def test_cascade_counts_block_parities_once():
+    rng = np.random.default_rng(3)
+    alice = random_bits(rng, 1000)
+
+    # Nothing to fix: one sweep, and only its block parities are disclosed
+    _, corrected, disclosed = cascade_correct(alice, alice.copy(), 0.05, passes=4, rng=rng)
+
+    first_block = int(0.73 / 0.05)
+    blocks = sum(-(-1000 // min(1000, first_block << i)) for i in range(4))
+    assert corrected == 0
+    assert disclosed == blocks
+
+
+def test_qber_upper_bound_never_trusts_an_error_free_sample():
+    assert qber_upper_bound(0.0, 50) > 0.02
+    assert qber_upper_bound(0.0, 0) == 0.5
+    assert 0.05 < qber_upper_bound(0.05, 10000) < 0.06
+
+
+@pytest.mark.parametrize("noise, eavesdrop", [(0.2, 0.0), (0.0, 1.0)])
+def test_pipeline_aborts_above_qber_threshold(noise, eavesdrop):
+    report = run_qkd_pipeline(8192, noise=noise, eavesdrop=eavesdrop, rng=np.random.default_rng(11))
+
+    assert report["qber"] > 0.11
+    assert not report["success"]
+    assert report["abort_reason"].startswith("QBER")
+    assert "final_key" not in report
+
+
+def test_secret_length_follows_entropy_minus_leak_and_margin():
+    margin = 32
+    report = run_qkd_pipeline(16384, noise=0.03, security_margin=margin, rng=np.random.default_rng(5))
+
+    assert report["success"]
+    assert report["residual_errors"] == 0
+    kept = report["sifted_bits"] - report["sample_bits"]
+    expected = int(kept * (1 - binary_entropy(report["qber"]))) - report["parities_disclosed"] - margin
+    # report["qber"] is rounded to 5 digits, which can move the floor by one bit
+    assert abs(report["final_bits"] - expected) <= 1
+    assert len(report["final_key"]) == 2 * -(-report["final_bits"] // 8)   # hex of the packed key
+
+
+def test_clean_channel_keeps_keys_equal():
+    report = run_qkd_pipeline(4096, rng=np.random.default_rng(2))
+
+    assert report["success"]
+    assert report["qber"] == 0.0
+    assert report["errors_before_correction"] == 0
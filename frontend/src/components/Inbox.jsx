@@ -3,6 +3,8 @@ import axios from 'axios';
 import { Download, CheckCircle, ArrowDownCircle, Loader, AlertCircle } from 'lucide-react';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:8000";
+const FALLBACK_POLL_MS = 60000;
+const STREAM_RETRY_MS = 5000;
 
 const Inbox = () => {
   const [incomingRecords, setIncomingRecords] = useState([]);
@@ -11,8 +13,46 @@ const Inbox = () => {
 
   useEffect(() => {
     fetchInbox();
-    const interval = setInterval(fetchInbox, 15000); // Poll every 15s
-    return () => clearInterval(interval);
+    let stream = null;
+    let reconnectTimer = null;
+    let closed = false;
+
+    // Server pushes an event when transfers arrive or are accepted elsewhere.
+    // The stream URL carries a short-lived ticket, never the access token.
+    const openStream = async () => {
+      try {
+        const token = localStorage.getItem('token');
+        const res = await axios.post(`${API_BASE_URL}/api/transfer/inbox/stream-ticket`, {}, {
+          headers: { Authorization: `Bearer ${token}` }
+        });
+        if (closed) return;
+        stream = new EventSource(`${API_BASE_URL}/api/transfer/inbox/stream?ticket=${encodeURIComponent(res.data.ticket)}`);
+        stream.addEventListener('transfer', fetchInbox);
+        stream.addEventListener('accepted', fetchInbox);
+        // Tickets are single-use in practice: reconnect with a fresh one
+        stream.onerror = () => {
+          stream.close();
+          scheduleReconnect();
+        };
+      } catch (err) {
+        console.error("Inbox stream unavailable, relying on polling:", err);
+        scheduleReconnect();
+      }
+    };
+    const scheduleReconnect = () => {
+      if (!closed) reconnectTimer = setTimeout(openStream, STREAM_RETRY_MS);
+    };
+    openStream();
+
+    // Slow poll as a fallback (stream down, expired login, other server workers)
+    const poll = setInterval(fetchInbox, FALLBACK_POLL_MS);
+
+    return () => {
+      closed = true;
+      clearTimeout(reconnectTimer);
+      clearInterval(poll);
+      if (stream) stream.close();
+    };
   }, []);
 
   const fetchInbox = async () => {